@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_archive.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Read the .svg of a harvest directly from a zip or tar archive.
+
+Harvests are kept as `depot_*` folders, or as zip archives; prior to
+any work, they had to be unpacked into the working directory, i.e. each
+.svg was read and written once more.  This module lets the scripts read
+the .svg from the archive instead:
+
++ `archive_entries` lists name, size and time of modification of the
+  .svg (for a zip archive, by its central directory only),
++ `archive_members` yields name and content of each .svg in the order
+  of the archive, i.e. by one sequential read (a compressed tar archive
+  is read as a stream, without seeks),
++ `archive_writer` collects .svg into a new zip or tar archive.
+
+Members in sub folders of the archive are reported by their file name
+only, as the shards of a folder (see `dek_scan.py`).  Of members with
+the same file name in different sub folders, only the first is reported,
+the others are named in a warning.  The scripts `dek_scan.py`,
+`dek_delta.py` (option `--archive`), `dek_quick_csv_3.py` and
+`dek_csv_4.py` (option `--archive`) accept an archive in place of a
+folder; `dek_optimize_5d.py` reads from and writes into archives."""
+
+import contextlib
+import io
+import os
+import tarfile
+import time
+import zipfile
+
+
+def is_archive(path):
+    """check if a path is a zip or tar archive (rather than a folder)"""
+    if not os.path.isfile(path):
+        return False
+    return zipfile.is_zipfile(path) or tarfile.is_tarfile(path)
+
+
+def _is_svg(name):
+    """check if a member of an archive is about a .svg"""
+    return name.endswith(".svg") and not name.endswith("/")
+
+
+def _first_of_name(member, seen):
+    """report the file name of a member, or None if reported earlier
+
+    The file names reported are recorded in `seen` (file name to member)."""
+    name = os.path.basename(member)
+    if name in seen:
+        print(f"Warning: `{member}` has the same name as `{seen[name]}` "
+              "in the archive, it is skipped.")
+        return None
+    seen[name] = member
+    return name
+
+
+def archive_entries(path):
+    """yield name, size and time of modification of the .svg"""
+    seen = {}
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if _is_svg(info.filename):
+                    name = _first_of_name(info.filename, seen)
+                    if name is not None:
+                        yield (name, info.file_size,
+                               time.mktime(info.date_time + (0, 0, -1)))
+        return
+
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if member.isfile() and _is_svg(member.name):
+                name = _first_of_name(member.name, seen)
+                if name is not None:
+                    yield name, member.size, member.mtime
+
+
+def archive_members(path):
+    """yield name and content of the .svg, by one sequential read"""
+    seen = {}
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if _is_svg(info.filename):
+                    name = _first_of_name(info.filename, seen)
+                    if name is not None:
+                        yield name, archive.read(info)
+        return
+
+    with tarfile.open(path, mode="r|*") as archive:
+        for member in archive:
+            if member.isfile() and _is_svg(member.name):
+                name = _first_of_name(member.name, seen)
+                if name is not None:
+                    yield name, archive.extractfile(member).read()
+
+
+@contextlib.contextmanager
+def archive_writer(path):
+    """collect .svg into a new archive, the kind chosen by the suffix
+
+    Usage:
+
+    with archive_writer("optimized.zip") as add:
+        add("DEK+Haus.svg", data)
+
+    Suffixes `.zip`, `.tar`, `.tar.gz` (`.tgz`), `.tar.xz` (`.txz`) and
+    `.tar.bz2` are recognized.  The archive is complete (and replaces an
+    earlier one of the same name) only once the block is left; if the
+    block raises an exception, the incomplete archive is removed."""
+    temporary = f"{path}.tmp"
+    stamp = time.time()
+
+    try:
+        if path.endswith(".zip"):
+            with zipfile.ZipFile(temporary,
+                                 mode="w",
+                                 compression=zipfile.ZIP_DEFLATED) as archive:
+
+                def add(name, data):
+                    archive.writestr(name, data)
+
+                yield add
+        else:
+            compression = ""
+            for suffixes, kind in (((".gz", ".tgz"), "gz"),
+                                   ((".xz", ".txz"), "xz"),
+                                   ((".bz2", ), "bz2")):
+                if path.endswith(suffixes):
+                    compression = kind
+            with tarfile.open(temporary, mode=f"w:{compression}") as archive:
+
+                def add(name, data):
+                    info = tarfile.TarInfo(name)
+                    info.size = len(data)
+                    info.mtime = stamp
+                    archive.addfile(info, io.BytesIO(data))
+
+                yield add
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(temporary)
+        raise
+
+    os.replace(temporary, path)
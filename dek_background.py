@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_background.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Supply the line system common to the plates once, not per plate.
+
+Almost each plate draws the same system of lines of DEK (shown alone
+by the `Grundlinien` plates on Wikimedia) below the strokes of the
+keyword; the deck thus repeats the same geometry about 39k times.  A
+call of
+
+python3 dek_background.py [folder] [--min-share 0.5]
+
+parses the .svg (by Python's ElementTree) and identifies the elements
+(children of the root, or of a group at the root) which are identical
+in at least the given share of the plates.  These are written once as
+`_dek_background.svg`, and the savings are reported.  Elements of a
+group are written with the attributes of their group (e.g., `stroke`),
+and only plates with the same root element (i.e., dimension) as the
+background are considered.  Prior to any write, a sample of plates
+(`--sample`) is rasterized (see `dek_verify.py`) with and without the
+common elements, the latter over the background; if they differ, the
+extraction is rejected.  Only with option `--apply`, the elements are
+removed from each plate which contains them.  The card template of Anki
+then supplies the background by CSS, e.g.
+
+img {
+  background: url("_dek_background.svg") no-repeat;
+  background-size: 100% 100%;
+}
+
+(the leading underscore prevents Anki from deleting the file as unused
+during `Check Media`).  Because the plates are written anew, this is
+the last step prior to the assembly of the deck, i.e. after the filter
+by dimension (`dek_csv_4.py`) and the optimization by svgcleaner.  As
+with the other scripts, work on a copy."""
+
+import argparse
+import hashlib
+import io
+import os
+import subprocess as sub
+import sys
+import zlib
+import xml.etree.ElementTree as ET
+from collections import Counter
+
+from dek_metrics import measure, progress
+from dek_scan import svg_paths
+from dek_verify import decode_png, is_flagged, rasterize, score
+
+BACKGROUND = "_dek_background.svg"
+SVG_NAMESPACE = "http://www.w3.org/2000/svg"
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="extract the line system common to the plates",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("folder",
+                        nargs="?",
+                        default=".",
+                        help="the folder of the .svg")
+    parser.add_argument("--min-share",
+                        metavar="",
+                        type=float,
+                        default=0.5,
+                        help="share of plates an element has to be part of")
+    parser.add_argument("--min-bytes",
+                        metavar="",
+                        type=int,
+                        default=100,
+                        help="ignore common elements smaller than this")
+    parser.add_argument("-o",
+                        "--output",
+                        metavar="",
+                        default=BACKGROUND,
+                        help="write the common background into this file")
+    parser.add_argument("--sample",
+                        metavar="",
+                        type=int,
+                        default=20,
+                        help="number of plates to check by rasterization")
+    parser.add_argument("--apply",
+                        action="store_true",
+                        help="remove the common background from the plates")
+
+    return parser.parse_args()
+
+
+def read_plate(source):
+    """parse a .svg, report its root and the prefixes of its namespaces"""
+    namespaces = {}
+    root = None
+    for event, item in ET.iterparse(source, events=("start-ns", "start")):
+        if event == "start-ns":
+            namespaces.setdefault(item[0], item[1])
+        elif root is None:
+            root = item
+    return root, namespaces
+
+
+def serialize(element):
+    """the markup of an element without the text trailing it"""
+    tail = element.tail
+    element.tail = None
+    try:
+        return ET.tostring(element, encoding="unicode")
+    finally:
+        element.tail = tail
+
+
+def describe(element):
+    """represent an element independent of the prefixes of namespaces"""
+    return (element.tag, sorted(element.attrib.items()),
+            (element.text or "").strip(),
+            [describe(child) for child in element])
+
+
+def context(parent, root):
+    """the attributes a group passes on to its children (style, transform)"""
+    if parent is root:
+        return {}
+    return {
+        key: value
+        for key, value in parent.attrib.items() if key != "id"
+    }
+
+
+def signature(parent, element, root):
+    """identify an element by its content and by the group around it"""
+    key = (sorted(context(parent, root).items()), describe(element))
+    return hashlib.sha1(repr(key).encode("utf-8")).digest()
+
+
+def extract(parent, element, root):
+    """the markup of an element, self-contained
+
+    An element of a group depends on the presentation attributes of the
+    group (e.g., `stroke` set by the group, `stroke-width` by the element,
+    as written by svgcleaner); it is thus wrapped by a group with the same
+    attributes."""
+    attributes = context(parent, root)
+    if not attributes:
+        return serialize(element)
+    wrapper = ET.Element(parent.tag, attributes)
+    wrapper.append(ET.fromstring(serialize(element)))
+    return serialize(wrapper)
+
+
+def candidates(root):
+    """yield parent and child for the children of the root and its groups"""
+    for child in list(root):
+        yield root, child
+        if child.tag == f"{{{SVG_NAMESPACE}}}g":
+            for grandchild in list(child):
+                yield child, grandchild
+
+
+def count_elements(paths):
+    """count in how many plates an element occurs (by its signature)"""
+    counts = Counter()
+    roots = Counter()
+
+    for path in paths:
+        try:
+            root, _ = read_plate(path)
+        except ET.ParseError:
+            continue
+        roots[tuple(sorted(root.attrib.items()))] += 1
+        counts.update({
+            signature(parent, element, root)
+            for parent, element in candidates(root)
+        })
+
+    return counts, roots
+
+
+def describe_elements(paths, keys):
+    """the markup of the elements of the given signatures, and for each
+    group among them the signatures of its children
+
+    The plates are read until each element was found once; as the keys
+    are those shared by many plates, this usually are a few plates."""
+    markup = {}
+    children = {}
+
+    for path in paths:
+        if len(markup) == len(keys):
+            break
+        try:
+            root, _ = read_plate(path)
+        except ET.ParseError:
+            continue
+        for parent, element in candidates(root):
+            key = signature(parent, element, root)
+            if key in keys and key not in markup:
+                markup[key] = extract(parent, element, root)
+                if element.tag == f"{{{SVG_NAMESPACE}}}g" and parent is root:
+                    children[key] = {
+                        signature(element, child, root)
+                        for child in element
+                    }
+
+    return markup, children
+
+
+def common_elements(counts,
+                    markup,
+                    children,
+                    number,
+                    min_share=0.5,
+                    min_bytes=100):
+    """select the elements shared by enough plates, the largest first
+
+    An element of a group already selected is not selected again; a group
+    selected replaces its elements selected earlier."""
+    selected = []
+    for key, count in counts.most_common():
+        if count < min_share * number:
+            break
+        if len(markup[key]) < min_bytes:
+            continue
+        if any(key in children.get(other, ()) for other in selected):
+            continue
+        selected = [
+            other for other in selected
+            if other not in children.get(key, ())
+        ]
+        selected.append(key)
+    return selected
+
+
+def background_svg(selected, markup, root_attributes):
+    """the common elements as one standalone .svg"""
+    ET.register_namespace("", SVG_NAMESPACE)
+    root = ET.Element(f"{{{SVG_NAMESPACE}}}svg", dict(root_attributes))
+    for key in selected:
+        root.append(ET.fromstring(markup[key]))
+
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def strip_plate(data, selected, root_attributes):
+    """the content of a plate without the common elements
+
+    Returns None if the plate does not contain them, or if its root
+    differs from the one of the background (e.g., another dimension).
+    The declaration of XML and the notation of empty elements follow
+    the original."""
+    try:
+        root, namespaces = read_plate(io.BytesIO(data))
+    except ET.ParseError:
+        return None
+    if tuple(sorted(root.attrib.items())) != root_attributes:
+        return None
+
+    removed = False
+    for parent, element in list(candidates(root)):
+        if element in parent and signature(parent, element,
+                                           root) in selected:
+            parent.remove(element)
+            removed = True
+    if not removed:
+        return None
+
+    for prefix, uri in namespaces.items():
+        ET.register_namespace(prefix, uri)
+    result = ET.tostring(root, encoding="unicode").encode("utf-8")
+    if b" />" not in data:
+        result = result.replace(b" />", b"/>")
+    if data.startswith(b"<?xml"):
+        end = data.index(b"?>") + 2
+        result = data[:end] + b"\n" + result
+    return result
+
+
+def compose(background, plate):
+    """lay the darkness of a plate over the one of its background"""
+    return bytes(255 - (255 - below) * (255 - above) // 255
+                 for below, above in zip(background, plate))
+
+
+def check_plates(paths, selected, root_attributes, background, sample=20):
+    """compare a sample of plates with their stripped version over the
+    background, both rasterized; report the plates which differ
+
+    The sample is spread across the folder; only the plates of the sample
+    (and those passed by for lack of the common elements) are read."""
+    step = max(1, len(paths) // sample)
+    order = (path for offset in range(step) for path in paths[offset::step])
+
+    below = decode_png(rasterize(background))
+    differing = []
+    checked = 0
+    for path in order:
+        if checked == sample:
+            break
+        with open(path, mode="rb") as source:
+            data = source.read()
+        stripped = strip_plate(data, selected, root_attributes)
+        if stripped is None:
+            continue
+        checked += 1
+        original = decode_png(rasterize(data))
+        above = decode_png(rasterize(stripped))
+        result = score(original, (*above[:2], compose(below[2], above[2])))
+        if is_flagged(result):
+            differing.append((path, result))
+    return differing
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    paths = [
+        path for name, path in svg_paths(args.folder)
+        if name != os.path.basename(args.output)
+    ]
+    if not paths:
+        print(f"There are no .svg in `{args.folder}`.  Exit.")
+        sys.exit()
+
+    with measure("background_count") as tally:
+        counts, roots = count_elements(
+            progress(paths, stage="count", tally=tally))
+
+    frequent = {
+        key
+        for key, count in counts.items()
+        if count >= args.min_share * len(paths)
+    }
+    markup, children = describe_elements(paths, frequent)
+    selected = common_elements(counts, markup, children, len(paths),
+                               args.min_share, args.min_bytes)
+    if not selected:
+        print("There are no elements common to enough plates.")
+        return
+
+    for key in selected:
+        print(f"{counts[key]:7} plates share {len(markup[key]):6} bytes: "
+              f"{markup[key][:60]}...")
+    root_attributes = roots.most_common(1)[0][0]
+    background = background_svg(selected, markup, root_attributes)
+    selected = set(selected)
+
+    try:
+        differing = check_plates(paths, selected, root_attributes, background,
+                                 args.sample)
+    except (OSError, sub.CalledProcessError, ValueError, zlib.error) as error:
+        print(f"\nThe plates could not be rasterized for a check ({error}).")
+        print("Nothing is written.  Exit.")
+        sys.exit()
+    if differing:
+        for path, result in differing:
+            print(f"{path}: {result}")
+        print(f"\n{len(differing)} plates differ from their stripped version "
+              "over the background.  The extraction is rejected.  Exit.")
+        sys.exit()
+
+    with open(args.output, mode="wb") as newfile:
+        newfile.write(background)
+    print(f"\nThe common background ({len(background)} bytes) is written to "
+          f"`{args.output}`.")
+
+    total = 0
+    saved = 0
+    with measure("background_strip") as tally:
+        for path in progress(paths, stage="strip", tally=tally):
+            with open(path, mode="rb") as source:
+                data = source.read()
+            total += len(data)
+            stripped = strip_plate(data, selected, root_attributes)
+            if stripped is None:
+                continue
+            saved += len(data) - len(stripped)
+            if args.apply:
+                with open(f"{path}.tmp", mode="wb") as newfile:
+                    newfile.write(stripped)
+                os.replace(f"{path}.tmp", path)
+
+    print(f"{len(paths)} plates, {total} bytes; "
+          f"{'saved' if args.apply else 'to save'} {saved} bytes "
+          f"({100 * saved / total:.1f}%).")
+    if not args.apply:
+        print("Call again with option `--apply` to remove the background.")
+
+
+if __name__ == "__main__":
+    main()
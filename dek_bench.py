@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_bench.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Benchmark the stages of the project on a synthetic corpus.
+
+The real working directory holds about 39k .svg (approx. 340 MB) which
+is neither handy to share, nor to reset between two runs.  Thus, this
+script generates a synthetic corpus of N plates in a temporary folder:
+file names in the pattern used by Wikimedia, tags distributed like the
+sets of the deck, .svg with a line system and strokes of about the size
+of the originals (about 5% of them in a different dimension), and a
+matching list of addresses.  A run by
+
+python3 dek_bench.py [-s 1000 10000 100000] [--optimize]
+
+times the detection of new and modified plates (`dek_delta.py`), the
+rename, the generation of the .csv, the filter by tag and dimension
+(on loose plates, and on a bundle of plates laid out as by svgcleaner;
+the number of plates skipped is checked), the clearance, and (optionally,
+because slow) the optimization with svgcleaner.  For each stage, wall
+time and files per second are measured in one run, and the peak of
+memory allocated by Python (tracemalloc) in a second run on a copy of
+the corpus, because the tracing slows Python down.  Both are reported
+and appended to file `bench_history.json`; thus changes of throughput
+and memory between two versions of the scripts become visible."""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess as sub
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from urllib.parse import quote
+
+import dek_bundle
+import dek_clearance
+import dek_csv_4
+import dek_delta
+import dek_quick_csv_3
+import dek_rename_2
+
+# population of the sets, see README.org
+TAGS = {
+    "A_DEK": 182,
+    "B_DEK": 531,
+    "C_DEK": 171,
+    "DEK": 34377,
+    "E_DEK": 139,
+    "F_DEK": 120,
+    "G_DEK": 837,
+    "K_DEK": 280,
+    "L_DEK": 55,
+    "N_DEK": 48,
+    "O_DEK": 31,
+    "P_DEK": 563,
+    "T_DEK": 60,
+    "U_DEK": 195,
+    "V_DEK": 381,
+    "Z_DEK": 208
+}
+
+SYLLABLES = [
+    "ab", "an", "auf", "aus", "be", "bau", "ber", "da", "der", "ein", "er",
+    "fahr", "ge", "gen", "haus", "heit", "keit", "land", "lich", "ma", "mit",
+    "ne", "sch", "schaft", "stra", "te", "ung", "ver", "wer", "zu", "ä", "ö",
+    "ü", "ß"
+]
+
+INFIX = "_Deutsche_Einheitskurzschrift_-_Verkehrsschrift_-_"
+
+HISTORY = "bench_history.json"
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="time the stages of the project on a synthetic corpus",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("-s",
+                        "--sizes",
+                        metavar="",
+                        type=int,
+                        nargs="+",
+                        default=[1000, 10000],
+                        help="number of plates of the corpora to test")
+    parser.add_argument("--optimize",
+                        action="store_true",
+                        help="include the optimization by svgcleaner")
+    parser.add_argument("--svgcleaner",
+                        metavar="",
+                        default="./svgcleaner",
+                        help="path to the executable of svgcleaner")
+    parser.add_argument("--history",
+                        metavar="",
+                        default=HISTORY,
+                        help="append the results to this file")
+    parser.add_argument("--seed",
+                        metavar="",
+                        type=int,
+                        default=2020,
+                        help="seed for the generation of the corpus")
+
+    return parser.parse_args()
+
+
+def synthetic_names(number, generator):
+    """generate unique file names in the pattern of Wikimedia"""
+    tags = list(TAGS)
+    weights = list(TAGS.values())
+    names = set()
+
+    while len(names) < number:
+        tag = generator.choices(tags, weights)[0]
+        words = 1
+        if tag in ("B_DEK", "C_DEK", "Z_DEK"):
+            words = {"B_DEK": 2, "C_DEK": 3, "Z_DEK": 5}[tag]
+        keyword = "_".join("".join(
+            generator.choices(SYLLABLES, k=generator.randint(1, 4)))
+                           for _ in range(words))
+        if tag in ("G_DEK", "P_DEK") or generator.random() < 0.3:
+            keyword = keyword.capitalize()
+        names.add(f"{tag}{INFIX}{keyword}.svg")
+
+    return sorted(names)
+
+
+def synthetic_svg(generator, regular=True):
+    """generate a plate with a line system and strokes"""
+    width, height = ("297mm", "210mm") if regular else ("420mm", "297mm")
+    lines = [
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>',
+        "<!-- synthetic plate of dek_bench.py -->", "<svg",
+        '   xmlns="http://www.w3.org/2000/svg"', f'width="{width}"',
+        f'height="{height}"', '   viewBox="0 0 297 210">',
+        '  <g id="Grundlinien" style="stroke:#000000;stroke-width:0.2">'
+    ]
+    for row in range(4):
+        for offset in (0, 4, 8, 12):
+            y = 30 + row * 45 + offset
+            lines.append(f'    <path d="M 10,{y} H 287" />')
+    lines.append("  </g>")
+    lines.append('  <g id="Kurzschrift" style="fill:none;stroke:#000000">')
+    for _ in range(generator.randint(40, 160)):
+        points = " ".join(f"{generator.uniform(10, 287):.4f},"
+                          f"{generator.uniform(10, 200):.4f}"
+                          for _ in range(4))
+        lines.append(f'    <path d="M {points}" '
+                     f'style="stroke-width:{generator.choice([0.5, 1.2])}" />')
+    lines.append("  </g>")
+    lines.append("</svg>")
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_corpus(folder, number, seed=2020):
+    """write a synthetic harvest and a matching list of addresses"""
+    generator = random.Random(seed)
+    os.makedirs(folder)
+    names = synthetic_names(number, generator)
+
+    with open(file=os.path.join(folder, "addresses.txt"),
+              mode="wt",
+              encoding="utf-8") as listing:
+        for name in names:
+            listing.write("https://upload.wikimedia.org/wikipedia/commons/"
+                          f"0/00/{quote(name)}\n")
+
+    plates = os.path.join(folder, "plates")
+    os.mkdir(plates)
+    for name in names:
+        with open(file=os.path.join(plates, name),
+                  mode="wt",
+                  encoding="utf-8") as newfile:
+            newfile.write(synthetic_svg(generator, generator.random() > 0.05))
+
+    return names
+
+
+def compact_svg(text):
+    """lay a plate out as svgcleaner does, i.e. all on one line"""
+    ET.register_namespace("", "http://www.w3.org/2000/svg")
+    return ET.tostring(ET.fromstring(text),
+                       encoding="unicode").replace("\n", "")
+
+
+def prepare_bundle(plates, folder):
+    """bundle compacted copies of the plates, as after the optimization
+
+    Reports the number of plates of a set of the white list in another
+    dimension, i.e. the number the filter by dimension has to skip."""
+    os.mkdir(folder)
+    irregular = 0
+    for name in os.listdir(plates):
+        if not name.endswith(".svg"):
+            continue
+        with open(file=os.path.join(plates, name), mode="rt",
+                  encoding="utf-8") as source:
+            text = source.read()
+        if ('width="420mm"' in text
+                and name.split("+")[0] in dek_csv_4.TAGS_WHITE_LIST):
+            irregular += 1
+        with open(file=os.path.join(folder, name), mode="wt",
+                  encoding="utf-8") as newfile:
+            newfile.write(compact_svg(text))
+
+    dek_bundle.write_bundle(folder, os.path.join(folder, dek_bundle.BUNDLE))
+    for name in os.listdir(folder):
+        if name.endswith(".svg"):
+            os.remove(os.path.join(folder, name))
+    return irregular
+
+
+def prepare_delta(folder, names, seed=2020):
+    """derive a previous (raw_data) and a current harvest (antechamber)"""
+    generator = random.Random(seed + 1)
+    raw_data = os.path.join(folder, "raw_data")
+    antechamber = os.path.join(folder, "antechamber")
+    os.mkdir(raw_data)
+    os.mkdir(antechamber)
+
+    for name in names:
+        source = os.path.join(folder, "plates", name)
+        draw = generator.random()
+        if draw > 0.02:
+            os.link(source, os.path.join(antechamber, name))
+        if draw < 0.97:
+            shutil.copy(source, os.path.join(raw_data, name))
+            if draw < 0.05:
+                with open(os.path.join(raw_data, name), mode="at") as changed:
+                    changed.write("<!-- previous revision -->\n")
+
+
+@contextlib.contextmanager
+def stage(results, name, folder, files, trace=False):
+    """time a stage, or (with trace) record its peak of memory
+
+    The tracing of tracemalloc slows Python down; thus, times and peaks
+    of memory are measured in separate runs."""
+    root = os.getcwd()
+    os.chdir(folder)
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+    finally:
+        elapsed = time.perf_counter() - start
+        if trace:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        os.chdir(root)
+
+    if trace:
+        results[name] = {"peak_bytes": peak}
+    else:
+        results[name] = {
+            "seconds": round(elapsed, 4),
+            "files_per_second": round(files / elapsed, 1) if elapsed else None
+        }
+
+
+def call_main(module, *arguments):
+    """call the main function of a script as if called from the CLI"""
+    saved = sys.argv
+    sys.argv = [module.__name__] + list(arguments)
+    try:
+        module.main()
+    finally:
+        sys.argv = saved
+
+
+def run_stages(folder,
+               names,
+               optimize=False,
+               svgcleaner="./svgcleaner",
+               trace=False):
+    """pass the synthetic corpus through the stages of the project"""
+    results = {}
+    plates = os.path.join(folder, "plates")
+    number = len(names)
+
+    prepare_delta(folder, names)
+    with stage(results, "delta_new", folder, number, trace):
+        dek_delta.identify_new_svg()
+    with stage(results, "delta_modified", folder, number, trace):
+        dek_delta.identify_modified_svg()
+
+    with stage(results, "rename", plates, number, trace):
+        call_main(dek_rename_2)
+    with stage(results, "csv", plates, number, trace):
+        call_main(dek_quick_csv_3)
+    optimized = os.path.join(folder, "optimized")
+    irregular = prepare_bundle(plates, optimized)
+    with stage(results, "dimension_filter_bundle", optimized, number, trace):
+        call_main(dek_quick_csv_3, "--bundle")
+        call_main(dek_csv_4, "dek2anki.csv", "--bundle")
+    skipped = os.path.join(optimized, "svg_skipped")
+    found = len(os.listdir(skipped)) if os.path.isdir(skipped) else 0
+    if found != irregular:
+        print(f"Check failed: the filter skipped {found} plates of the bundle "
+              f"rather than {irregular}.")
+        sys.exit(1)
+
+    with stage(results, "dimension_filter", plates, number, trace):
+        call_main(dek_csv_4, "dek2anki.csv")
+
+    with open(os.path.join(plates, "revised_anki4dek.csv"),
+              mode="at",
+              encoding="utf-8") as listing:
+        listing.write('orphan; <img src="DEK+nowhere.svg">; DEK\n')
+    with stage(results, "clearance", plates, number, trace):
+        call_main(dek_clearance, "revised_anki4dek.csv", "--force")
+
+    if optimize:
+        executable = os.path.abspath(svgcleaner)
+        script = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "dek_optimize_5c.sh")
+        os.symlink(executable, os.path.join(plates, "svgcleaner"))
+        try:
+            with stage(results, "optimize", plates, number, trace):
+                sub.run(["bash", script],
+                        cwd=plates,
+                        stdout=sub.DEVNULL,
+                        check=True)
+        except sub.CalledProcessError as error:
+            print(f"Stage optimize failed (exit status {error.returncode}), "
+                  "it is not recorded.")
+
+    return results
+
+
+def revision():
+    """report the git commit of the scripts, if available"""
+    try:
+        return sub.run(["git", "rev-parse", "--short", "HEAD"],
+                       cwd=os.path.dirname(os.path.abspath(__file__)),
+                       capture_output=True,
+                       text=True,
+                       check=True).stdout.strip()
+    except (OSError, sub.CalledProcessError):
+        return None
+
+
+def append_history(name, run):
+    """append a run to the record of earlier runs"""
+    history = []
+    if os.path.isfile(name):
+        with open(file=name, mode="rt", encoding="utf-8") as source:
+            history = json.load(source)
+
+    history.append(run)
+    with open(file=name, mode="wt", encoding="utf-8") as newfile:
+        json.dump(history, newfile, indent=1)
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if args.optimize and not (os.path.isfile(args.svgcleaner)
+                              and os.access(args.svgcleaner, os.X_OK)):
+        print(f"No executable svgcleaner at `{args.svgcleaner}`.  Exit.")
+        sys.exit()
+
+    run = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "revision": revision(),
+        "python": platform.python_version(),
+        "results": {}
+    }
+
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory(prefix="dek_bench_") as folder:
+            corpus = os.path.join(folder, "corpus")
+            start = time.perf_counter()
+            names = generate_corpus(corpus, size, args.seed)
+            print(f"\n{size} plates generated in "
+                  f"{time.perf_counter() - start:.1f} s.")
+
+            traced = os.path.join(folder, "traced")
+            shutil.copytree(corpus, traced)
+
+            results = run_stages(corpus, names, args.optimize,
+                                 args.svgcleaner)
+            memory = run_stages(traced, names, trace=True)
+            for name, result in results.items():
+                result["peak_bytes"] = memory.get(name, {}).get("peak_bytes")
+            run["results"][str(size)] = results
+
+        print(f"{'stage':24} {'seconds':>9} {'files/s':>10} {'peak MB':>8}")
+        for name, result in results.items():
+            peak = result["peak_bytes"]
+            print(f"{name:24} {result['seconds']:9.3f} "
+                  f"{result['files_per_second'] or 0:10.1f} " +
+                  (f"{peak / 2**20:8.2f}" if peak is not None else
+                   f"{'-':>8}"))
+
+    append_history(args.history, run)
+    print(f"\nResults appended to `{args.history}`.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_bundle.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Pack the optimized .svg into one bundle for fast reads.
+
+Each pass over the working directory opens and closes about 39k small
+files; the time is spent on system calls and metadata rather than on
+the content.  Once the plates are optimized, a call of
+
+python3 dek_bundle.py -w [folder]
+
+concatenates the .svg into one data file `dek_bundle.dat`, and records
+offset, length and md5sum of each plate in the index `dek_bundle.idx`
+(JSON).  Read by `mmap`, the content of a plate then is a slice of the
+mapped file, without a copy.  Scripts `dek_quick_csv_3.py`,
+`dek_csv_4.py` and `dek_verify.py` accept option `--bundle` to read
+from the bundle instead of the loose files.  Further, by
+
+python3 dek_bundle.py --check
+python3 dek_bundle.py -x collection
+
+the bundle is checked against the md5sums of its index, or unpacked
+into the flat folder `collection` (e.g., for the assembly of the deck)."""
+
+import argparse
+import contextlib
+import hashlib
+import json
+import mmap
+import os
+import sys
+from collections import namedtuple
+
+from dek_metrics import measure, progress
+from dek_scan import svg_paths
+
+BUNDLE = "dek_bundle"
+
+Bundle = namedtuple("Bundle", ["data", "index"])
+
+# bundles opened by read_plate, kept open for the life of the process
+_OPENED = {}
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="pack the .svg into one bundle with an index",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-w",
+                       "--write",
+                       metavar="",
+                       nargs="?",
+                       const=".",
+                       help="pack the .svg of this folder")
+    group.add_argument("-x",
+                       "--extract",
+                       metavar="",
+                       help="unpack the bundle into this folder")
+    group.add_argument("--check",
+                       action="store_true",
+                       help="check the content against the index")
+
+    parser.add_argument("-b",
+                        "--bundle",
+                        metavar="",
+                        default=BUNDLE,
+                        help="name of the bundle (without extension)")
+
+    return parser.parse_args()
+
+
+def write_bundle(folder=".", name=BUNDLE):
+    """concatenate the .svg of a folder, write data file and index"""
+    index = {}
+    offset = 0
+
+    with measure("bundle_write") as tally, open(f"{name}.dat.tmp",
+                                                mode="wb") as newfile:
+        for file, path in progress(sorted(svg_paths(folder)),
+                                   stage="bundle",
+                                   tally=tally):
+            with open(path, mode="rb") as source:
+                data = source.read()
+            newfile.write(data)
+            index[file] = [offset, len(data), hashlib.md5(data).hexdigest()]
+            offset += len(data)
+        tally["bytes"] = offset
+
+    with open(file=f"{name}.idx.tmp", mode="wt", encoding="utf-8") as newfile:
+        json.dump(index, newfile, ensure_ascii=False)
+    os.replace(f"{name}.dat.tmp", f"{name}.dat")
+    os.replace(f"{name}.idx.tmp", f"{name}.idx")
+
+    return len(index), offset
+
+
+def read_index(name=BUNDLE):
+    """read the index of a bundle, or None if there is no bundle"""
+    try:
+        with open(file=f"{name}.idx", mode="rt", encoding="utf-8") as source:
+            return json.load(source)
+    except FileNotFoundError:
+        return None
+
+
+@contextlib.contextmanager
+def open_bundle(name=BUNDLE):
+    """map the data file of a bundle into memory
+
+    Usage:
+
+    with open_bundle() as bundle, plate_data(bundle, "DEK+Haus.svg") as data:
+        ...
+
+    Slices still referenced once the bundle is closed prevent the release
+    of the mapping, hence the use of `plate_data` as context manager."""
+    index = read_index(name)
+    if index is None:
+        print(f"There is no bundle `{name}`, see dek_bundle.py.  Exit.")
+        sys.exit()
+
+    with open(f"{name}.dat", mode="rb") as source:
+        if os.fstat(source.fileno()).st_size == 0:
+            yield Bundle(memoryview(b""), index)
+            return
+        with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            try:
+                yield Bundle(view, index)
+            finally:
+                view.release()
+
+
+def plate_data(bundle, name):
+    """report the content of one .svg as slice of the bundle (no copy)"""
+    offset, length, _ = bundle.index[name]
+    return bundle.data[offset:offset + length]
+
+
+def read_plate(name, bundle_name=BUNDLE):
+    """report the content of one .svg, keeping the bundle open
+
+    This is meant for functions called repeatedly (e.g., by a pool of
+    processes) where a context manager per call is too expensive."""
+    if bundle_name not in _OPENED:
+        stack = contextlib.ExitStack()
+        _OPENED[bundle_name] = (stack.enter_context(open_bundle(bundle_name)),
+                                stack)
+    with plate_data(_OPENED[bundle_name][0], name) as data:
+        return bytes(data)
+
+
+def check_bundle(name=BUNDLE):
+    """report the .svg whose content does not match the index"""
+    damaged = []
+    with measure("bundle_check") as tally, open_bundle(name) as bundle:
+        for file in progress(list(bundle.index), stage="check", tally=tally):
+            with plate_data(bundle, file) as data:
+                tally["bytes"] += len(data)
+                if hashlib.md5(data).hexdigest() != bundle.index[file][2]:
+                    damaged.append(file)
+    return damaged
+
+
+def extract_bundle(folder, name=BUNDLE):
+    """write the .svg of the bundle into a flat folder"""
+    os.makedirs(folder, exist_ok=True)
+    with measure("bundle_extract") as tally, open_bundle(name) as bundle:
+        for file in progress(list(bundle.index), stage="extract", tally=tally):
+            with plate_data(bundle, file) as data, open(
+                    os.path.join(folder, file), mode="wb") as newfile:
+                newfile.write(data)
+                tally["bytes"] += len(data)
+    return tally["files"]
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if args.write:
+        number, size = write_bundle(args.write, args.bundle)
+        print(f"{number} .svg ({size} bytes) packed into `{args.bundle}.dat`.")
+
+    elif args.check:
+        damaged = check_bundle(args.bundle)
+        for file in damaged:
+            print(file)
+        print(f"{len(damaged)} .svg in the bundle do not match the index.")
+
+    elif args.extract:
+        number = extract_bundle(args.extract, args.bundle)
+        print(f"{number} .svg written into `{args.extract}`.")
+
+
+if __name__ == "__main__":
+    main()
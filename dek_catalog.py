@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_catalog.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Catalog of the DEK plates in one SQLite database.
+
+Otherwise, the state of the plates is spread across the listings
+`svg_of_interest.txt`, `bad_list.txt`, `dek2anki.csv`,
+`revised_anki4dek.csv`, `svg_to_retract.txt`, and the membership of
+files in folders like `svg_skipped`, `empty_svg`, `new_svg`, or
+`modified_svg`.  Once file `dek_catalog.sqlite` is created by
+
+python3 dek_catalog.py --init
+
+in the working directory, the other scripts of this project record
+their findings (fetched, new, modified, retracted, skipped, accepted,
+empty, quarantined) there, too.  Each plate is identified by its file
+name after the rename by `dek_rename_2.py` (e.g., `G_DEK+Aachen.svg`);
+each change of status is kept in table `history`.
+
+The catalog is fed and consulted from the CLI, for instance by
+
+python3 dek_catalog.py --addresses 2020-05-30_DEK_input_list.txt
+python3 dek_catalog.py --scan .
+python3 dek_catalog.py --csv revised_anki4dek.csv
+python3 dek_catalog.py --release 2026-10
+python3 dek_catalog.py --query --tag G_DEK --since 2026-10
+
+where the last example lists the geographic plates whose content
+changed since release `2026-10` was marked."""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+from datetime import datetime, timezone
+from urllib.parse import unquote
+
+from dek_records import read_records
+from dek_rename_2 import create_new_name
+from dek_scan import scan_svg, svg_contents
+
+CATALOG = "dek_catalog.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plates (
+    name    TEXT PRIMARY KEY,
+    url     TEXT,
+    keyword TEXT,
+    tag     TEXT,
+    width   TEXT,
+    height  TEXT,
+    md5     TEXT,
+    size    INTEGER,
+    mtime   REAL,
+    status  TEXT,
+    changed TEXT,
+    updated TEXT
+);
+CREATE INDEX IF NOT EXISTS plates_tag_changed ON plates (tag, changed);
+CREATE INDEX IF NOT EXISTS plates_status ON plates (status);
+CREATE INDEX IF NOT EXISTS plates_changed ON plates (changed);
+CREATE TABLE IF NOT EXISTS history (
+    id     INTEGER PRIMARY KEY,
+    name   TEXT NOT NULL,
+    status TEXT,
+    detail TEXT,
+    stamp  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS history_name ON history (name);
+CREATE INDEX IF NOT EXISTS history_stamp ON history (stamp);
+CREATE TABLE IF NOT EXISTS releases (
+    name  TEXT PRIMARY KEY,
+    stamp TEXT NOT NULL
+);
+"""
+
+FIELDS = [
+    "url", "keyword", "tag", "width", "height", "md5", "size", "mtime",
+    "status"
+]
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="maintain the SQLite catalog of the DEK plates",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("--catalog",
+                        metavar="",
+                        default=CATALOG,
+                        help="the database file")
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--init",
+                       action="store_true",
+                       help="create the catalog")
+    group.add_argument("--addresses",
+                       metavar="",
+                       help="import the addresses of a Wikimedia listing")
+    group.add_argument("--scan",
+                       metavar="",
+                       help="record size and checksum of the .svg of a folder"
+                       " or an archive")
+    group.add_argument("--csv",
+                       metavar="",
+                       help="import keywords and tags of a .csv for Anki")
+    group.add_argument("--release",
+                       metavar="",
+                       help="mark the current state as release of this name")
+    group.add_argument("--query",
+                       action="store_true",
+                       help="list plates matching --tag, --status, --since")
+
+    parser.add_argument("--tag", metavar="", help="restrict to this tag")
+    parser.add_argument("--status", metavar="", help="restrict to this status")
+    parser.add_argument("--since",
+                        metavar="",
+                        help="changed after this release (or ISO date)")
+
+    return parser.parse_args()
+
+
+def now():
+    """time stamp in UTC, ISO 8601"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds")
+
+
+def plate_key(name):
+    """identify a plate by its file name after the rename"""
+    return create_new_name(os.path.basename(str(name)))
+
+
+def open_catalog(name=CATALOG, create=False):
+    """connect to the catalog; None if there is none (and none to create)"""
+    if not create and not os.path.isfile(name):
+        return None
+
+    connection = sqlite3.connect(name)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def upsert(connection, rows, detail=None):
+    """insert or update plates, log changes of status into the history
+
+    Argument rows is an iterable of dictionaries with key `name` and any of
+    the FIELDS.  Column `changed` follows changes of the checksum (or the
+    first appearance of a plate), column `updated` any change."""
+    stamp = now()
+    cursor = connection.cursor()
+
+    for row in rows:
+        name = plate_key(row["name"])
+        old = cursor.execute("SELECT md5, status FROM plates WHERE name = ?",
+                             (name, )).fetchone()
+        values = {key: row[key] for key in FIELDS if key in row}
+
+        if old is None:
+            values["changed"] = stamp
+            values["updated"] = stamp
+            columns = ["name"] + list(values)
+            cursor.execute(
+                f"INSERT INTO plates ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})",
+                [name] + list(values.values()))
+        else:
+            if "md5" in values and values["md5"] != old[0]:
+                values["changed"] = stamp
+            values["updated"] = stamp
+            assignments = ", ".join(f"{key} = ?" for key in values)
+            cursor.execute(f"UPDATE plates SET {assignments} WHERE name = ?",
+                           list(values.values()) + [name])
+
+        if "status" in values and (old is None or old[1] != values["status"]):
+            cursor.execute(
+                "INSERT INTO history (name, status, detail, stamp) "
+                "VALUES (?, ?, ?, ?)", (name, values["status"], detail, stamp))
+
+    connection.commit()
+
+
+def note_rows(rows, detail=None, catalog=CATALOG):
+    """record information about plates, if there is a catalog
+
+    This is the hook used by the other scripts; without file
+    `dek_catalog.sqlite` in the current working directory, it does nothing."""
+    connection = open_catalog(catalog)
+    if connection is None:
+        return
+
+    upsert(connection, rows, detail)
+    connection.close()
+
+
+def note_status(names, status, detail=None, catalog=CATALOG):
+    """record a status for plates, if there is a catalog"""
+    note_rows(({
+        "name": name,
+        "status": status
+    } for name in names), detail, catalog)
+
+
+def import_addresses(connection, name):
+    """import the addresses of a listing by the Wikimedia download portal"""
+    rows = []
+
+    with open(file=name, mode="rt", encoding="utf-8") as source:
+        for line in source:
+            url = str(line).strip()
+            if url.endswith(".svg"):
+                rows.append({"name": unquote(url), "url": url})
+
+    upsert(connection, rows, detail=f"addresses {name}")
+    print(f"{len(rows)} addresses imported.")
+
+
+def import_scan(connection, folder):
+    """record size, time of modification and checksum of the .svg
+
+    The checksum is only computed anew for files whose size or time of
+    modification differs from the record.  In an archive, these files are
+    read by one sequential pass once the listing is complete."""
+    known = {
+        row[0]: row[1:]
+        for row in connection.execute("SELECT name, size, mtime, md5 FROM "
+                                      "plates")
+    }
+    rows = []
+    in_archive = {}
+
+    for plate in scan_svg(folder):
+        key = plate_key(plate.name)
+        record = known.get(key)
+        if record and record[0] == plate.size and record[1] == plate.mtime:
+            continue
+        row = {"name": plate.name, "size": plate.size, "mtime": plate.mtime}
+        if plate.path is None:
+            in_archive[plate.name] = row
+            continue
+        with open(plate.path, mode="rb") as source:
+            row["md5"] = hashlib.md5(source.read()).hexdigest()
+        rows.append(row)
+
+    if in_archive:
+        for name, data in svg_contents(folder):
+            if name in in_archive:
+                in_archive[name]["md5"] = hashlib.md5(data).hexdigest()
+        rows.extend(in_archive.values())
+
+    upsert(connection, rows, detail=f"scan {folder}")
+    print(f"{len(rows)} plates recorded anew.")
+
+
+def import_csv(connection, name):
+    """import keyword and tag of the entries of a .csv for Anki"""
+    rows = []
+
+    for record in read_records(name):
+        row = {"name": record.image, "keyword": record.keyword}
+        row["tag"] = record.tags[0] if record.tags else record.image.split(
+            "+")[0]
+        rows.append(row)
+
+    upsert(connection, rows, detail=f"csv {name}")
+    print(f"{len(rows)} entries imported.")
+
+
+def mark_release(connection, name):
+    """retain the current time as reference point of a release"""
+    with connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO releases (name, stamp) VALUES (?, ?)",
+            (name, now()))
+    print(f"Release `{name}` marked.")
+
+
+def query(connection, tag=None, status=None, since=None):
+    """list the plates matching the criteria"""
+    conditions, parameters = [], []
+
+    if tag:
+        conditions.append("tag = ?")
+        parameters.append(tag)
+    if status:
+        conditions.append("status = ?")
+        parameters.append(status)
+    if since:
+        release = connection.execute(
+            "SELECT stamp FROM releases WHERE name = ?", (since, )).fetchone()
+        conditions.append("changed > ?")
+        parameters.append(release[0] if release else since)
+
+    statement = "SELECT name FROM plates"
+    if conditions:
+        statement += " WHERE " + " AND ".join(conditions)
+    statement += " ORDER BY name"
+
+    return [row[0] for row in connection.execute(statement, parameters)]
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    connection = open_catalog(args.catalog, create=args.init)
+    if connection is None:
+        print(f"There is no catalog `{args.catalog}`; create it by --init.")
+        sys.exit()
+
+    if args.init:
+        print(f"Catalog `{args.catalog}` is ready.")
+    elif args.addresses:
+        import_addresses(connection, args.addresses)
+    elif args.scan:
+        import_scan(connection, args.scan)
+    elif args.csv:
+        import_csv(connection, args.csv)
+    elif args.release:
+        mark_release(connection, args.release)
+    elif args.query:
+        for name in query(connection, args.tag, args.status, args.since):
+            print(name)
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
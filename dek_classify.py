@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_classify.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Propose tags for the plates still in the default set `DEK`.
+
+About 90% of the plates are not (yet) assigned to one of the sets
+`A_DEK` ... `Z_DEK`.  This script learns from the plates already
+tagged in the catalog (`dek_catalog.py`) which sequences of characters
+(two to four letters) and which simple rules (the number of words,
+a capital initial, a keyword in capitals only, a contrasting `ABER`,
+digits, hyphens) are typical for a set.  The model is a naive Bayes
+classifier, i.e. a linear model of the logarithms of the frequencies;
+it is trained and applied within seconds on an ordinary CPU, without
+libraries outside Python's standard library.  A run by
+
+python3 dek_classify.py [-c 0.8] [-o proposals.tsv]
+
+proposes a tag for each keyword of set `DEK` where the model's
+confidence exceeds the threshold, records the proposals in table
+`proposals` of the catalog and optionally in a tab separated file for
+manual review.  Sets about erroneous or not recommended symbolizations
+(`F_DEK`, `N_DEK`) can not be recognized by the keyword and hence are
+not proposed.  A keyword of set `DEK` is classified by a model trained
+without it (`--folds` models, each trained without a share of set
+`DEK`); else, the model would favor `DEK` for the very keywords it
+learned as such.  Option `--evaluate` reports the accuracy of the model
+on a tenth of the keywords (tagged and of set `DEK`) retained from the
+training."""
+
+import argparse
+import math
+import random
+import re
+import sys
+from collections import Counter, defaultdict
+
+from dek_catalog import CATALOG, now, open_catalog
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS proposals (
+    name       TEXT PRIMARY KEY,
+    tag        TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    stamp      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS proposals_tag ON proposals (tag, confidence);
+"""
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="propose tags for untagged DEK plates",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("-c",
+                        "--confidence",
+                        metavar="",
+                        type=float,
+                        default=0.8,
+                        help="minimal confidence of a proposal")
+    parser.add_argument("-o",
+                        "--output",
+                        metavar="",
+                        default=None,
+                        help="write the proposals into this file, too")
+    parser.add_argument("--exclude",
+                        metavar="",
+                        nargs="*",
+                        default=["F_DEK", "N_DEK"],
+                        help="sets not to propose")
+    parser.add_argument("--folds",
+                        metavar="",
+                        type=int,
+                        default=5,
+                        help="number of folds of the keywords of set DEK")
+    parser.add_argument("--evaluate",
+                        action="store_true",
+                        help="only report the accuracy of the model")
+    parser.add_argument("--catalog",
+                        metavar="",
+                        default=CATALOG,
+                        help="the database file")
+
+    return parser.parse_args()
+
+
+def features(keyword):
+    """describe a keyword by sequences of characters and rules"""
+    text = f"^{str(keyword).lower()}$"
+    found = [
+        text[i:i + n] for n in (2, 3, 4) for i in range(len(text) - n + 1)
+    ]
+
+    words = [word for word in re.split(r"[_\s]+", str(keyword)) if word]
+    found.append(f"#words={min(len(words), 4)}")
+    if keyword[:1].isupper():
+        found.append("#capital")
+    if len(keyword) > 1 and keyword.isupper():
+        found.append("#capitals_only")
+    if "ABER" in keyword:
+        found.append("#aber")
+    if any(character.isdigit() for character in keyword):
+        found.append("#digit")
+    if "-" in keyword:
+        found.append("#hyphen")
+
+    return found
+
+
+def train(samples, alpha=0.1):
+    """train the classifier on pairs of keyword and tag
+
+    Returns the logarithms of the prior of each tag, of the probability of
+    each feature per tag, and of the probability of a feature unseen in a
+    tag (Laplace smoothing by alpha)."""
+    counts = defaultdict(Counter)
+    documents = Counter()
+
+    for keyword, tag in samples:
+        counts[tag].update(features(keyword))
+        documents[tag] += 1
+
+    vocabulary = set()
+    for counter in counts.values():
+        vocabulary.update(counter)
+
+    total = sum(documents.values())
+    model = {"prior": {}, "weights": {}, "unseen": {}}
+    for tag, counter in counts.items():
+        denominator = sum(counter.values()) + alpha * len(vocabulary)
+        model["prior"][tag] = math.log(documents[tag] / total)
+        model["unseen"][tag] = math.log(alpha / denominator)
+        model["weights"][tag] = {
+            feature: math.log((count + alpha) / denominator)
+            for feature, count in counter.items()
+        }
+
+    return model
+
+
+def predict(model, keyword):
+    """rank the tags for a keyword by their probability"""
+    found = features(keyword)
+    scores = {}
+
+    for tag, prior in model["prior"].items():
+        weights = model["weights"][tag]
+        unseen = model["unseen"][tag]
+        scores[tag] = prior + sum(
+            weights.get(feature, unseen) for feature in found)
+
+    top = max(scores.values())
+    norm = sum(math.exp(score - top) for score in scores.values())
+    ranking = [(tag, math.exp(score - top) / norm)
+               for tag, score in scores.items()]
+    ranking.sort(key=lambda item: -item[1])
+
+    return ranking
+
+
+def read_samples(connection):
+    """read keyword and tag of the plates with a keyword"""
+    return connection.execute(
+        "SELECT name, keyword, tag FROM plates "
+        "WHERE keyword IS NOT NULL AND tag IS NOT NULL").fetchall()
+
+
+def evaluate(rows):
+    """report the accuracy on a tenth of the keywords, retained from the
+    training; tagged keywords and those of set `DEK` alike"""
+    tagged = [(keyword, tag) for _, keyword, tag in rows if tag != "DEK"]
+    untagged = [(keyword, tag) for _, keyword, tag in rows if tag == "DEK"]
+    if len(tagged) < 10:
+        print("Too few tagged keywords to evaluate the model.")
+        sys.exit()
+
+    generator = random.Random(0)
+    generator.shuffle(tagged)
+    generator.shuffle(untagged)
+    cut = len(tagged) // 10
+    cut_untagged = len(untagged) // 10
+    model = train(tagged[cut:] + untagged[cut_untagged:])
+
+    hits = Counter()
+    totals = Counter()
+    checked = tagged[:cut] + untagged[:cut_untagged]
+    for keyword, tag in checked:
+        totals[tag] += 1
+        if predict(model, keyword)[0][0] == tag:
+            hits[tag] += 1
+
+    print(f"{'set':5} {'checked':>8} {'correct':>8}")
+    for tag in sorted(totals):
+        print(f"{tag:5} {totals[tag]:8} {hits[tag]:8}")
+    print(f"accuracy: {sum(hits.values()) / len(checked):.3f}")
+
+
+def propose(connection, rows, threshold=0.8, exclude=(), folds=5):
+    """propose tags for the keywords of set `DEK`
+
+    A keyword is not classified by a model trained on itself: the keywords
+    of set `DEK` are split into folds, each classified by a model trained
+    on the tagged keywords and the other folds."""
+    tagged = [(keyword, tag) for _, keyword, tag in rows if tag != "DEK"]
+    untagged = [(name, keyword) for name, keyword, tag in rows
+                if tag == "DEK"]
+    folds = max(2, folds)
+
+    proposals = []
+    for fold in range(folds):
+        model = train(tagged + [(keyword, "DEK")
+                                for number, (_, keyword) in enumerate(untagged)
+                                if number % folds != fold])
+        for tag in exclude:
+            model["prior"].pop(tag, None)
+
+        for name, keyword in untagged[fold::folds]:
+            best, confidence = predict(model, keyword)[0]
+            if best != "DEK" and confidence >= threshold:
+                proposals.append((name, best, round(confidence, 4)))
+
+    stamp = now()
+    connection.executescript(SCHEMA)
+    with connection:
+        connection.execute("DELETE FROM proposals")
+        connection.executemany(
+            "INSERT INTO proposals (name, tag, confidence, stamp) "
+            "VALUES (?, ?, ?, ?)",
+            (proposal + (stamp, ) for proposal in proposals))
+
+    return proposals
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    connection = open_catalog(args.catalog)
+    if connection is None:
+        print(f"There is no catalog `{args.catalog}`, see dek_catalog.py.")
+        sys.exit()
+
+    rows = read_samples(connection)
+    if args.evaluate:
+        evaluate(rows)
+        connection.close()
+        return
+
+    proposals = propose(connection, rows, args.confidence, args.exclude,
+                        args.folds)
+    connection.close()
+
+    tally = Counter(tag for _, tag, _ in proposals)
+    for tag in sorted(tally):
+        print(f"{tag:5} {tally[tag]:8}")
+    print(f"{len(proposals)} proposals recorded in table `proposals`.")
+
+    if args.output:
+        try:
+            with open(file=args.output, mode="wt",
+                      encoding="utf-8") as newfile:
+                for name, tag, confidence in sorted(proposals,
+                                                    key=lambda x: -x[2]):
+                    newfile.write(f"{name}\t{tag}\t{confidence}\n")
+            print(f"See `{args.output}` for the proposals.")
+        except OSError:
+            print(f"Error writing file `{args.output}`.")
+
+
+if __name__ == "__main__":
+    main()
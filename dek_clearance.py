@@ -6,13 +6,19 @@ name   : dek_clearance.py
 author : nbehrnd@yahoo.com
 license: GPLv2
 date   : [2023-06-04 Sun]
-edit   : [2026-03-24 Tue]
+edit   : [2026-10-19 Mon]
 """
 
 import argparse
 import os
 import shutil
 import sys
+from datetime import datetime
+
+from dek_catalog import note_status
+from dek_metrics import measure
+from dek_records import format_record, read_records, write_records
+from dek_scan import snapshot
 
 
 def get_args():
@@ -21,7 +27,8 @@ def get_args():
     parser = argparse.ArgumentParser(
         description="""The optimization with svgcleaner may yield empty .svg,
 and the .csv still may contain entries (now) irrelevant to the Anki deck to
-assemble.  This script lints the .csv and working directory accordingly.""",
+assemble.  This script lints the .csv and working directory accordingly.
+Files are not deleted, but moved into a time stamped quarantine folder.""",
         formatter_class=argparse.ArgumentDefaultsHelpFormatter)
 
     parser.add_argument('file',
@@ -29,99 +36,138 @@ assemble.  This script lints the .csv and working directory accordingly.""",
                         type=argparse.FileType('rt'),
                         default=None)
 
-    return parser.parse_args()
-
+    parser.add_argument('-n',
+                        '--dry-run',
+                        action='store_true',
+                        help='only report the actions, change nothing')
 
-def remove_empty_files():
-    """remove .svg which, after optimization, are empty
+    parser.add_argument('-r',
+                        '--report',
+                        metavar='',
+                        default=None,
+                        help='write the list of actions into this file')
 
-    Overall, the optimization with `dek_optimize_5b.sh` proceeds faster, than
-    the one by `dek_optimize_5a.sh`, but sometimes yields an empty .svg.  Move
-    these files into a separate folder."""
-    deposit = str("empty_svg")
-    empty = []  # files where optimization lead to be empty
+    parser.add_argument('-f',
+                        '--force',
+                        action='store_true',
+                        help='apply the plan even if it affects most files')
 
-    try:
-        os.mkdir(deposit)
-    except IOError:
-        print(f"Folder {deposit} already exist, hence exit.")
-        sys.exit()
+    return parser.parse_args()
 
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
-            if os.path.getsize(file) == 0:
-                shutil.move(file, deposit)
-                empty.append(file)
 
-    if empty:
-        print(f"Check {deposit} for {len(empty)} empty files.")
-    else:
-        os.rmdir(deposit)
+def read_reference(reference, header=None):
+    """read the .csv once, its header into dictionary `header`"""
+    return list(read_records(reference, header))
 
 
-def remove_entries_without_file(reference):
-    """remove entries from the .csv without corresponding .svg
+def plan_clearance(plates, entries):
+    """compute all actions of the clearance, without performing any
 
-    The .csv file may contain entries to .svg which do not exist (anymore).
-    To prevent presence of an Anki card with long hand form, but lacking a
-    short hand symbolization, remove these entries."""
-    new_list = []
+    + .svg which, after optimization, are empty.  Overall, the optimization
+      with `dek_optimize_5b.sh` proceeds faster, than the one by
+      `dek_optimize_5a.sh`, but sometimes yields an empty .svg.
+    + entries of the .csv without corresponding .svg.  To prevent presence
+      of an Anki card with long hand form, but lacking a short hand
+      symbolization, these entries are to be removed.
+    + .svg files without entry in the .csv which per the listing no longer
+      are of interest."""
+    empty = sorted(name for name, plate in plates.items() if plate.size == 0)
+    present = set(plates) - set(empty)
+    referenced = {entry.image for entry in entries}
 
-    with open(file=reference, mode="rt", encoding="utf-8") as source:
-        for line in source:
-            line = str(line).strip()
-            address = line.split("; ")[1]
-            address = address[10:-2]
-            if os.path.isfile(address):
-                new_list.append(line)
+    plan = {
+        "empty": empty,
+        "orphan": sorted(present - referenced),
+        "entry": [entry for entry in entries if entry.image not in present],
+        "retain": present & referenced,
+    }
 
-    os.remove(reference)
+    return plan
 
-    with open(file=reference, mode="wt", encoding="utf-8") as new:
-        for entry in new_list:
-            new.write(f"{entry}\n")
 
+def write_report(plan, name):
+    """record the actions planned as permanent record"""
+    try:
+        with open(file=name, mode="wt", encoding="utf-8") as newfile:
+            for action in ["empty", "orphan"]:
+                for item in plan[action]:
+                    newfile.write(f"{action}\t{item}\n")
+            for entry in plan["entry"]:
+                newfile.write(f"entry\t{format_record(entry)}\n")
+        print(f"File `{name}` lists the actions.")
+    except OSError:
+        print(f"Error writing file `{name}`.")
+
+
+def check_plausibility(plan, plates):
+    """prevent that e.g. a mis-parsed .csv empties the working directory
+
+    If the plan would retain less than half of the .svg present, the
+    clearance stops unless explicitly enforced."""
+    if plates and len(plan["retain"]) < len(plates) / 2:
+        print(f"Only {len(plan['retain'])} of {len(plates)} .svg would be "
+              "retained.  Check the .csv, or enforce by `--force`.  Exit.")
+        sys.exit()
 
-def remove_files_without_reference(reference):
-    """remove .svg files without entry in the .csv
-
-    There still may be .svg files in the current working directory which per
-    the listing in the .csv no longer are of interest.  For now, these files
-    should be removed.  This function aims to complement the one earlier."""
-    checklist = []
 
-    with open(file=reference, mode="rt", encoding="utf-8") as source:
-        for line in source:
-            line = str(line).strip()
-            address = line.split("; ")[1]
-            address = address[10:-2]
-            checklist.append(address)
+def quarantine(plan, plates):
+    """move the empty and the unreferenced .svg into a quarantine folder
+
+    Each run uses a new folder with a time stamp, thus repeated runs do not
+    need a manual clean up first.  The folders are created once, then the
+    files are moved by rename which within one file system is a cheap change
+    of the directory entries only."""
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    deposit = f"quarantine_{stamp}"
+    counter = 1
+    while os.path.exists(deposit):
+        counter += 1
+        deposit = f"quarantine_{stamp}_{counter}"
+
+    for action in ["empty", "orphan"]:
+        if not plan[action]:
+            continue
+        folder = os.path.join(deposit, action)
+        os.makedirs(folder)
+        for file in plan[action]:
+            target = os.path.join(folder, file)
+            try:
+                os.rename(plates[file].path, target)
+            except OSError:
+                shutil.move(plates[file].path, target)
+
+    if plan["empty"] or plan["orphan"]:
+        print(f"Check {deposit} for {len(plan['empty'])} empty and "
+              f"{len(plan['orphan'])} unreferenced files.")
+
+
+def remove_entries_without_file(reference, entries, plan, header=None):
+    """remove entries from the .csv without corresponding .svg
 
-    check_set = set(checklist)
+    The header of the .csv is kept, its number of entries (`data`) is
+    updated.  The new .csv is written into a temporary file first which
+    then replaces the old one; thus an interruption never leaves a
+    truncated .csv behind."""
+    to_remove = set(plan["entry"])
+    retained = [entry for entry in entries if entry not in to_remove]
 
-    for file in os.listdir("."):
-        if str(file).endswith(".svg"):
-            if str(file) not in check_set:
-                os.remove(file)
+    if header and "data" in header:
+        header["data"] = len(retained)
+    write_records(reference, retained, header)
 
 
-def report_synopsis():
+def report_synopsis(names):
     """briefly list the population of the categories
 
     Some of the symbolizations belong to a particular topical sub set, such as
     `G_DEK` about geography, `L_DEK` about Latin, etc.  This allows a training
     based on this tag reflected in the files' file name and is an information
     equally useful to report on the project's landing page."""
-    tag_listing = []
     assistant_dictionary = {}
     key_listing = []
 
-    for file in os.listdir("."):
-        if str(file).endswith(".svg"):
-            tag = str(file).split("+")[0]
-            tag_listing.append(tag)
-
-    for tag in tag_listing:
+    for file in names:
+        tag = str(file).split("+")[0]
         assistant_dictionary.setdefault(tag, 0)
         assistant_dictionary[tag] = assistant_dictionary[tag] + 1
 
@@ -140,13 +186,41 @@ def report_synopsis():
 
 
 def main():
-    """Join the functionalities"""
+    """Join the functionalities
+
+    The working directory and the .csv are read once each; all subsequent
+    decisions are set operations on these two records."""
 
     args = get_args()
-    remove_empty_files()
-    remove_entries_without_file(args.file.name)
-    remove_files_without_reference(args.file.name)
-    report_synopsis()
+    args.file.close()
+
+    with measure("clearance_plan") as tally:
+        plates = snapshot(".")
+        header = {}
+        entries = read_reference(args.file.name, header)
+        plan = plan_clearance(plates, entries)
+        tally["files"] = len(plates)
+        tally["bytes"] = sum(plate.size for plate in plates.values())
+
+    print(f"empty .svg:                {len(plan['empty']):>5}")
+    print(f".svg without entry:        {len(plan['orphan']):>5}")
+    print(f"entries without .svg:      {len(plan['entry']):>5}")
+    if args.report:
+        write_report(plan, args.report)
+
+    if args.dry_run:
+        print("Dry run, nothing was changed.")
+    else:
+        if not args.force:
+            check_plausibility(plan, plates)
+        with measure("clearance_apply") as tally:
+            quarantine(plan, plates)
+            tally["files"] = len(plan["empty"]) + len(plan["orphan"])
+        note_status(plan["empty"], "empty")
+        note_status(plan["orphan"], "quarantined")
+        remove_entries_without_file(args.file.name, entries, plan, header)
+
+    report_synopsis(plan["retain"])
 
 
 # --------------------------------------------------
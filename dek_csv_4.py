@@ -6,7 +6,7 @@
 # author:  nbehrnd@yahoo.com
 # license: GPLv2
 # date:    [2020-05-31 Sun]
-# edit:    [2026-03-24 Tue]
+# edit:    [2026-10-19 Mon]
 #
 """ Consolidation of dek_quick_csv.py's dek2anki.csv relational table.
 
@@ -29,14 +29,65 @@ deck.  Though the function to provide (some) of these tags aiming a focussed
 review still is retained in this script, the script does not use it."""
 
 import argparse
+import contextlib
 import os
 import shutil
 import sys
+import xml.etree.ElementTree as ET
+
+from dek_archive import archive_members
+from dek_bundle import BUNDLE, open_bundle, plate_data
+from dek_catalog import note_rows, note_status
+from dek_metrics import measure, progress
+from dek_records import read_records, write_records
+from dek_rename_2 import create_new_name
+from dek_scan import plate_path, read_layout
+
+# Sets of plates deemed suitable for the Anki deck; e.g., `T_DEK` (longer
+# texts) is not.  Script dek_fetch_1.py applies the same list prior to the
+# download.
+TAGS_WHITE_LIST = [
+    "DEK", "A_DEK", "B_DEK", "C_DEK", "E_DEK", "F_DEK", "G_DEK", "K_DEK",
+    "N_DEK", "O_DEK", "P_DEK", "L_DEK", "U_DEK", "V_DEK", "Z_DEK"
+]
+
+# Dimension of the regular plates (DIN A4, landscape).  Wikimedia reports
+# the dimension of a .svg sized in mm in pixels; MediaWiki's reader of SVG
+# has used 90 dpi (1052 x 744 pixels), CSS uses 96 dpi (1123 x 794 pixels).
+# Either is accepted.
+REGULAR_WIDTH = "297mm"
+REGULAR_HEIGHT = "210mm"
+DPI_CONVERSIONS = (90, 96)
 
 # from hyphen import Hyphenator  # this is outside of Python's standard library
 # h_de = Hyphenator('de_DE')
 
 
+# Identification of 17 non-ambigous symbolizations -- a concept.
+#
+# It is plausible that these lists are incomplete.
+GROUPED_CONSONANTS = [
+    'br', 'cr', 'fr', 'gr', 'kr', 'mpf', 'ndr', 'pfr', 'rdr', 'schl', 'schm',
+    'schn', 'schr', 'spr', 'str', 'wr', 'zw'
+]
+
+# Incomplete list of 59, apparently easier to retrieve, kuerzel.
+# Again, there are some for this simple string-based approach is
+# not working well enough (e.g., 'wo' vs. 'woll' or 'worden'; or
+# 'in' vs. 'meine', 'deine'. 'hint', 'keine', 'seine' or 'sind';
+# or 'un' vs. 'unter'; or reserved symbolizations like 'dem' which
+# is not used in 'demokratisch') thus not yet considered here.
+KUERZEL = [
+    'also', 'ander', 'ant', 'auf', 'aus', 'besonder', 'bis', 'dar', 'deine',
+    'dessen', 'deutsch', 'dies', 'doch', 'durch', 'fort', 'für', 'gegen',
+    'heit', 'hint', 'ion', 'keine', 'konnt', 'lich', 'lung', 'meine', 'mit',
+    'nichts', 'noch', 'nur', 'ohne', 'rung', 'schaft', 'schon', 'seine',
+    'selbst', 'sich', 'sind', 'solch', 'soll', 'sonder', 'über', 'unter',
+    'vielleicht', 'voll', 'vom', 'von', 'völl', 'wenn', 'will', 'wird', 'woll',
+    'worden', 'wurd', 'zer', 'zum', 'zurück', 'zurück', 'zusammen', 'zwischen'
+]
+
+
 def get_args():
     """Get command-line arguments"""
 
@@ -49,16 +100,25 @@ def get_args():
                         type=argparse.FileType('rt'),
                         default=None)
 
+    parser.add_argument('--bundle',
+                        metavar='',
+                        nargs='?',
+                        const=BUNDLE,
+                        default=None,
+                        help='read the .svg from this bundle (dek_bundle.py)')
+    parser.add_argument('--archive',
+                        metavar='',
+                        default=None,
+                        help='read the .svg from this zip or tar archive')
+
     return parser.parse_args()
 
 
 def read_current_listing(data):
     """read the .csv file to process"""
-    old_list = []
-    old_list = data.read().splitlines()
-
-    header = old_list[:4]
-    list_proper = old_list[4:]
+    header = {}
+    data.close()
+    list_proper = list(read_records(data.name, header))
 
     return header, list_proper
 
@@ -70,38 +130,86 @@ def whitelist_categories(old_list):
     are considered not useful for the deck to build; for example `T` (longer
     texts).  I would like to gradually open  the deck by white listing the
     sub sets."""
-    tags_white_list = [
-        "DEK", "A_DEK", "B_DEK", "C_DEK", "E_DEK", "F_DEK", "G_DEK", "K_DEK",
-        "N_DEK", "O_DEK", "P_DEK", "L_DEK", "U_DEK", "V_DEK", "Z_DEK"
-    ]
     new_list = []
 
     for entry in old_list:
-        image_source = entry.split("img src=")[1]
-        image_source = image_source[1:-2]
-        tag = image_source.split("+")[0]
+        tag = entry.image.split("+")[0]
 
-        if tag in tags_white_list:
+        if tag in TAGS_WHITE_LIST:
             new_list.append(entry)
 
     return new_list
 
 
-def dimension_filter(old_listing):
-    """remove plates too large in dimension
+def is_regular_pixels(width, height, tolerance=2):
+    """check a dimension reported in pixels (e.g., by Wikimedia)
 
-    Most of the plates share the same dimensions, however not all.  Anki would
-    compensate for this by variation of the scale of display, at expense of
-    detail visible while working with the deck to build.  The .svg fetched from
-    wikimedia are henced checked if they contain both a string `width="297mm"`
-    and `height="210mm"`; else, they are not considered for now.
+    The tolerance covers the rounding (or truncation) to whole pixels."""
+    for dpi in DPI_CONVERSIONS:
+        expected_width = float(REGULAR_WIDTH[:-2]) * dpi / 25.4
+        expected_height = float(REGULAR_HEIGHT[:-2]) * dpi / 25.4
+        if (abs(width - expected_width) <= tolerance
+                and abs(height - expected_height) <= tolerance):
+            return True
+    return False
 
-    Because this can remove too many plates (which perhaps can be adjusted), a
-    report of plates passing the test, as well as plates not passing the test
-    is installed."""
-    list_pass, list_skip, list_inaccessible = [], [], []
 
-    to_check = str("svg_skipped")
+def svg_dimension(data, chunk=4096):
+    """report width and height of the root element of a .svg
+
+    The content is parsed only until the start tag of the root element,
+    independent of its layout (e.g., one line per attribute as written
+    by Inkscape, or the whole tag on one line as written by svgcleaner).
+    Returns (None, None) if the content does not parse."""
+    parser = ET.XMLPullParser(events=("start", ))
+    try:
+        for offset in range(0, len(data), chunk):
+            parser.feed(bytes(data[offset:offset + chunk]))
+            for _, element in parser.read_events():
+                return element.get("width"), element.get("height")
+    except ET.ParseError:
+        pass
+    return None, None
+
+
+def is_regular_size(width, height):
+    """check width and height of a root element for the regular dimension"""
+    return ((width or "").strip() == REGULAR_WIDTH
+            and (height or "").strip() == REGULAR_HEIGHT)
+
+
+def has_regular_dimension(data):
+    """check the root element of a .svg for the regular dimension"""
+    return is_regular_size(*svg_dimension(data))
+
+
+def skipped_row(entry, width, height):
+    """describe a plate skipped for the catalog, with its dimension"""
+    return {
+        "name": entry.image,
+        "keyword": entry.keyword,
+        "tag": entry.image.split("+")[0],
+        "width": width,
+        "height": height,
+        "status": "skipped"
+    }
+
+
+def read_svg(image_source, bundle=None):
+    """read the content of a .svg, either loose or from a bundle"""
+    if bundle is not None:
+        try:
+            with plate_data(bundle, os.path.basename(image_source)) as data:
+                return bytes(data)
+        except KeyError as error:
+            raise IOError(f"{image_source} not in bundle") from error
+
+    with open(image_source, mode="rb") as source:
+        return source.read()
+
+
+def create_skip_folder(to_check="svg_skipped"):
+    """create the folder for the plates skipped, stop if it exists"""
     try:
         os.mkdir(to_check)
     except IOError:
@@ -113,30 +221,113 @@ def dimension_filter(old_listing):
         else:
             print(f"error to create {to_check}")
 
-    for entry in old_listing:
-        image_source = entry.split("img src=")[1]
-        image_source = image_source[1:-2]
-        content = []
 
-        try:
-            with open(image_source, mode="rt", encoding="utf-8") as source:
-                for line in source:
-                    content.append(str(line).strip())
+def dimension_filter(old_listing, tally=None, bundle_name=None):
+    """remove plates too large in dimension
 
-            if (str('width="297mm"') in content) and (str('height="210mm"')
-                                                      in content):
-                list_pass.append(entry)
-            else:
-                list_skip.append(entry)
-                shutil.move(image_source, to_check)
+    Most of the plates share the same dimensions, however not all.  Anki would
+    compensate for this by variation of the scale of display, at expense of
+    detail visible while working with the deck to build.  The .svg fetched from
+    wikimedia are henced checked if their root element has the attributes
+    `width="297mm"` and `height="210mm"`; else, they are not considered for
+    now.
+
+    Because this can remove too many plates (which perhaps can be adjusted), a
+    report of plates passing the test, as well as plates not passing the test
+    is installed.
+
+    If the name of a bundle (dek_bundle.py) is provided, the .svg are read
+    from the bundle; a plate skipped is then written from the bundle into
+    folder `svg_skipped` unless there is a loose copy to move there."""
+    list_pass, list_skip, list_inaccessible = [], [], []
+    skipped_rows = []
 
-        except IOError:
-            list_inaccessible.append(entry)
+    to_check = str("svg_skipped")
+    create_skip_folder(to_check)
+
+    layout = read_layout(".")
+
+    with contextlib.ExitStack() as stack:
+        bundle = None
+        if bundle_name is not None:
+            bundle = stack.enter_context(open_bundle(bundle_name))
+
+        for entry in progress(old_listing,
+                              stage="dimension filter",
+                              tally=tally):
+            image_source = plate_path(entry.image, ".", layout)
+
+            try:
+                content = read_svg(image_source, bundle)
+                width, height = svg_dimension(content)
+
+                if is_regular_size(width, height):
+                    list_pass.append(entry)
+                else:
+                    list_skip.append(entry)
+                    skipped_rows.append(skipped_row(entry, width, height))
+                    if bundle is None or os.path.isfile(image_source):
+                        shutil.move(image_source, to_check)
+                    else:
+                        with plate_data(bundle, entry.image) as data, open(
+                                os.path.join(to_check, entry.image),
+                                mode="wb") as newfile:
+                            newfile.write(data)
+
+            except IOError:
+                list_inaccessible.append(entry)
 
     # check if an intermediate folder can be removed:
     if len(list_skip) == 0:
         os.rmdir("svg_skipped")
 
+    note_rows(skipped_rows, to_check)
+    return list_pass, list_skip, list_inaccessible
+
+
+def dimension_filter_archive(old_listing, archive, tally=None):
+    """as dimension_filter, with the .svg read from a zip or tar archive
+
+    The archive is read once, in its own order.  Its members carry the
+    names prior to the rename (e.g., of a harvest); a plate skipped is
+    written from the archive into folder `svg_skipped`."""
+    wanted = {entry.image: entry for entry in old_listing}
+    passed, skipped = set(), set()
+    skipped_rows = []
+
+    to_check = str("svg_skipped")
+    create_skip_folder(to_check)
+
+    for name, data in progress(archive_members(archive),
+                               total=len(wanted),
+                               stage="dimension filter",
+                               tally=tally):
+        image = create_new_name(name)
+        if image not in wanted:
+            continue
+        if tally is not None:
+            tally["bytes"] += len(data)
+
+        width, height = svg_dimension(data)
+        if is_regular_size(width, height):
+            passed.add(image)
+        else:
+            skipped.add(image)
+            skipped_rows.append(skipped_row(wanted[image], width, height))
+            with open(os.path.join(to_check, image), mode="wb") as newfile:
+                newfile.write(data)
+
+    list_pass = [entry for entry in old_listing if entry.image in passed]
+    list_skip = [entry for entry in old_listing if entry.image in skipped]
+    list_inaccessible = [
+        entry for entry in old_listing
+        if entry.image not in passed and entry.image not in skipped
+    ]
+
+    if len(list_skip) == 0:
+        os.rmdir(to_check)
+
+    note_rows(skipped_rows, to_check)
     return list_pass, list_skip, list_inaccessible
 
 
@@ -145,19 +336,12 @@ def tag_entries(old_list):
     new_list = []
 
     for entry in old_list:
-        image_source = entry.split("img src=")[1]
-        image_source = image_source[1:-2]
-        tag = image_source.split("+")[0]
-
-        entry = "; ".join([entry, tag])
-        new_list.append(entry)
+        tag = entry.image.split("+")[0]
+        new_list.append(entry._replace(tags=(tag, )))
 
     print(f"\n{len(new_list)} entries retained in `revised_anki4dek.csv`.")
     try:
-        with open(file="revised_anki4dek.csv", mode="wt",
-                  encoding="utf-8") as new:
-            for entry in new_list:
-                new.write(f"{entry}\n")
+        write_records("revised_anki4dek.csv", new_list)
     except IOError:
         print("Error while writing the new .csv file")
 
@@ -173,31 +357,9 @@ def analysator():
 
     # Identification of 17 non-ambigous symbolizations -- a concept.
     #
-    # It is plausible that these lists are incomplete.
     # It is complemented by later rules discerning e.g., 'st' from 'str'.
     test = str(check).lower()
-    grouped_consonants = [
-        'br', 'cr', 'fr', 'gr', 'kr', 'mpf', 'ndr', 'pfr', 'rdr', 'schl',
-        'schm', 'schn', 'schr', 'spr', 'str', 'wr', 'zw'
-    ]
-
-    # Incomplete list of 59, apparently easier to retrieve, kuerzel.
-    # Again, there are some for this simple string-based approach is
-    # not working well enough (e.g., 'wo' vs. 'woll' or 'worden'; or
-    # 'in' vs. 'meine', 'deine'. 'hint', 'keine', 'seine' or 'sind';
-    # or 'un' vs. 'unter'; or reserved symbolizations like 'dem' which
-    # is not used in 'demokratisch') thus not yet considered here.
-    kuerzel = [
-        'also', 'ander', 'ant', 'auf', 'aus', 'besonder', 'bis', 'dar',
-        'deine', 'dessen', 'deutsch', 'dies', 'doch', 'durch', 'fort', 'für',
-        'gegen', 'heit', 'hint', 'ion', 'keine', 'konnt', 'lich', 'lung',
-        'meine', 'mit', 'nichts', 'noch', 'nur', 'ohne', 'rung', 'schaft',
-        'schon', 'seine', 'selbst', 'sich', 'sind', 'solch', 'soll', 'sonder',
-        'über', 'unter', 'vielleicht', 'voll', 'vom', 'von', 'völl', 'wenn',
-        'will', 'wird', 'woll', 'worden', 'wurd', 'zer', 'zum', 'zurück',
-        'zurück', 'zusammen', 'zwischen'
-    ]
-    check_list = grouped_consonants + kuerzel
+    check_list = GROUPED_CONSONANTS + KUERZEL
 
     for element in check_list:
         if element in test:  # check:
@@ -274,7 +436,13 @@ def main():
     tag_filtered = whitelist_categories(old_list)
     print(f"permitted by tag:          {len(tag_filtered)}")
 
-    list_pass, list_skip, list_inaccessible = dimension_filter(tag_filtered)
+    with measure("dimension_filter") as tally:
+        if args.archive:
+            list_pass, list_skip, list_inaccessible = dimension_filter_archive(
+                tag_filtered, args.archive, tally)
+        else:
+            list_pass, list_skip, list_inaccessible = dimension_filter(
+                tag_filtered, tally, args.bundle)
     print("----")
     print("check plates by their dimension:")
     print(f"plate passes test:         {len(list_pass):>5}")
@@ -286,6 +454,16 @@ def main():
 
     tag_entries(list_pass)
 
+    note_status((entry.image for entry in list_inaccessible), "inaccessible")
+    note_rows(({
+        "name": entry.image,
+        "keyword": entry.keyword,
+        "tag": entry.image.split("+")[0],
+        "width": REGULAR_WIDTH,
+        "height": REGULAR_HEIGHT,
+        "status": "accepted"
+    } for entry in list_pass), "revised_anki4dek.csv")
+
 
 # --------------------------------------------------
 if __name__ == '__main__':
@@ -49,7 +49,9 @@
         sub-folder retract_svg.  In addition, file svg_to_retract.txt
         is written as permanent record into the root of the project,
         i.e., at the level of folders raw_data and antechamber.  This
-        file is accessed again by option -R.
+        file is accessed again by option -R.  The comparison requires a
+        complete harvest: the plates a harvest by `dek_fetch_1.py
+        --prefilter` did not download would be reported as retracted.
 
     -R  The scripts, documentation, as well as the .svg (both in raw,
         as well as in simplified form) of this script are managed with
@@ -66,6 +68,18 @@
 
     The use of the parameters -n, -m, -r, and -R is mutually exclusive.
 
+    If the previous harvest is kept as a snapshot by dek_store.py,
+    option --manifest (name of the snapshot, or path to its manifest)
+    replaces folder raw_data for -n, -m and -r.  The checksums then are
+    read from the manifest rather than computed from the files, and the
+    .svg to retract are restored from the store.
+
+    With option --archive (a zip or tar archive of the current harvest,
+    e.g. as fetched from the download portal), -n and -m read the .svg
+    directly from the archive instead of folder antechamber.  The .svg
+    identified are written into antechamber/new_svg, or modified_svg;
+    the archive is not altered.
+
     Upon approval, the remaining raw data are then copy-pasted into
     folder raw_data.  Copies of these new raw data are to be renamed,
     svg optimized, and tagged "as usual"; this allows both a creation
@@ -78,11 +92,18 @@
 
 import argparse
 import hashlib
+import lzma
 import os
 import subprocess
 import shutil
 import sys
 
+from dek_archive import archive_members
+from dek_catalog import note_status
+from dek_metrics import measure, progress
+from dek_scan import plate_path, read_layout, svg_names, svg_paths
+from dek_store import STORE, load_manifest, manifest_store, read_blob
+
 
 def check_python():
     """Assure the script is used with Python 3, only."""
@@ -95,7 +116,7 @@ def check_python():
         print("\nBe sure to call the script with Python 3, only.\n")
 
 
-def identify_new_svg():
+def identify_new_svg(manifest=None):
     """Identify the new files present in the update branch."""
     svg_previous_sessions = []
     svg_updating_session = []
@@ -103,17 +124,14 @@ def identify_new_svg():
     root = os.getcwd()
 
     # learn about the already existing data:
-    os.chdir("raw_data")
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
-            svg_previous_sessions.append(file)
-    os.chdir(root)
+    if manifest is not None:
+        svg_previous_sessions = list(manifest["plates"])
+    else:
+        svg_previous_sessions = list(svg_names("raw_data"))
 
     # learn about the data containing the update:
     os.chdir("antechamber")
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
-            svg_updating_session.append(file)
+    svg_updating_session = dict(svg_paths("."))
 
     # discern of the files:
     set_svg_previous_sessions = set(svg_previous_sessions)
@@ -129,32 +147,41 @@ def identify_new_svg():
 
     for new in set_svg_new:
         svg_new.append(new)
-        old_path = os.path.join(os.getcwd(), str(new))
+        old_path = os.path.join(os.getcwd(), svg_updating_session[new])
         new_path = os.path.join(os.getcwd(), str("new_svg"), str(new))
         shutil.move(old_path, new_path)
 
     print("By name, there are {} new .svg files.".format(len(svg_new)))
     os.chdir(root)
+    note_status(svg_new, "new")
 
 
-def identify_modified_svg():
+def identify_modified_svg(tally=None, manifest=None):
     """Identify .svg changed in antechamber vz. already curated .svg."""
     svg_previous_sessions = []
     register_modified = []
     root = os.getcwd()
 
     # learn about the already existing data:
-    os.chdir("raw_data")
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
+    if manifest is not None:
+        for file, entry in manifest["plates"].items():
+            svg_previous_sessions.append("{} {}".format(entry["md5"], file))
+    else:
+        os.chdir("raw_data")
+        for file, path in progress(list(svg_paths(".")),
+                                   stage="checksums raw_data",
+                                   tally=tally):
 
             # compute a checksum:
-            with open(file, mode="rb") as reference:
+            with open(path, mode="rb") as reference:
                 data = reference.read()
+                if tally is not None:
+                    tally["bytes"] += len(data)
                 md5sum_reference = hashlib.md5(data).hexdigest()
-                retain = str("{} {}".format(str(md5sum_reference), str(file)))
+                retain = str("{} {}".format(str(md5sum_reference),
+                                            str(file)))
             svg_previous_sessions.append(retain)
-    os.chdir(root)
+        os.chdir(root)
 
     # learn about the data containing the update:
     os.chdir("antechamber")
@@ -164,22 +191,26 @@ def identify_modified_svg():
         print("Creation of folder 'modified' failed.  Exit.")
         sys.exit()
 
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
+    svg_previous_sessions = set(svg_previous_sessions)
+    for file, path in progress(list(svg_paths(".")),
+                               stage="checksums antechamber",
+                               tally=tally):
 
-            # compute a checksum:
-            with open(file, mode="rb") as to_test:
-                data = to_test.read()
-                md5sum_reference = hashlib.md5(data).hexdigest()
-                retain = str("{} {}".format(str(md5sum_reference), str(file)))
+        # compute a checksum:
+        with open(path, mode="rb") as to_test:
+            data = to_test.read()
+            if tally is not None:
+                tally["bytes"] += len(data)
+            md5sum_reference = hashlib.md5(data).hexdigest()
+            retain = str("{} {}".format(str(md5sum_reference), str(file)))
 
-            # now compare with the already known:
-            if str(retain) not in svg_previous_sessions:
-                register_modified.append(file)
+        # now compare with the already known:
+        if str(retain) not in svg_previous_sessions:
+            register_modified.append(file)
 
-                old_path = os.path.join(os.getcwd(), file)
-                new_path = os.path.join(os.getcwd(), str("modified_svg"), file)
-                shutil.move(old_path, new_path)
+            old_path = os.path.join(os.getcwd(), path)
+            new_path = os.path.join(os.getcwd(), str("modified_svg"), file)
+            shutil.move(old_path, new_path)
 
     if len(register_modified) == 0:
         print("There are no modified .svg data.")
@@ -188,9 +219,70 @@ def identify_modified_svg():
         print("There is / are {} altered .svg moved to folder 'modified'.".
               format(len(register_modified)))
     os.chdir(root)
+    note_status(register_modified, "modified")
+
+
+def identify_in_archive(archive, kind="new", tally=None, manifest=None):
+    """Identify new (or modified) .svg in a zip or tar archive of a harvest.
+
+    Instead of moving files of folder antechamber, the archive is read
+    once, and the members in question are written into antechamber's
+    sub-folder new_svg (or modified_svg).  As -m follows -n, a member
+    unknown to the previous harvest is not considered as modified."""
+    previous = {}
+
+    # learn about the already existing data:
+    if manifest is not None:
+        for file, entry in manifest["plates"].items():
+            previous[file] = entry["md5"]
+    elif kind == "new":
+        previous = dict.fromkeys(svg_names("raw_data"))
+    else:
+        for file, path in progress(list(svg_paths("raw_data")),
+                                   stage="checksums raw_data",
+                                   tally=tally):
+            with open(path, mode="rb") as reference:
+                data = reference.read()
+            if tally is not None:
+                tally["bytes"] += len(data)
+            previous[file] = hashlib.md5(data).hexdigest()
 
+    folder = os.path.join("antechamber", "{}_svg".format(kind))
+    try:
+        os.makedirs(folder)
+    except IOError:
+        print("Creation of folder '{}' failed.  Exit.".format(folder))
+        sys.exit()
 
-def retracted_svg():
+    # read the data containing the update once:
+    register = []
+    for file, data in progress(archive_members(archive),
+                               stage="members of {}".format(archive),
+                               tally=tally):
+        if tally is not None:
+            tally["bytes"] += len(data)
+        if kind == "new":
+            selected = file not in previous
+        else:
+            selected = (file in previous and
+                        previous[file] != hashlib.md5(data).hexdigest())
+        if selected:
+            register.append(file)
+            with open(os.path.join(folder, file), mode="wb") as newfile:
+                newfile.write(data)
+
+    if kind == "new":
+        print("By name, there are {} new .svg files.".format(len(register)))
+    elif len(register) == 0:
+        print("There are no modified .svg data.")
+        os.rmdir(folder)
+    else:
+        print("There is / are {} altered .svg written to folder '{}'.".format(
+            len(register), folder))
+    note_status(register, kind)
+
+
+def retracted_svg(manifest=None, store=STORE):
     """The .svg only present in raw_data are those deemed 'retracted'."""
     register_antechamber = []
     register_retract = []
@@ -205,29 +297,43 @@ def retracted_svg():
         print("Creation of folder 'retract_svg' failed.  Exit.")
         sys.exit()
 
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
-            register_antechamber.append(file)
+    register_antechamber = set(svg_names("."))
     os.chdir(root)
 
-    # learn about the already existing data:
-    os.chdir("raw_data")
-    for file in os.listdir("."):
-        if file.endswith(".svg") and (str(file) not in register_antechamber):
+    # learn about the already existing data, either kept in the store:
+    if manifest is not None:
+        for file, entry in manifest["plates"].items():
+            if file in register_antechamber:
+                continue
             register_retract.append(file)
-
-            old_path = os.path.join(os.getcwd(), file)
-            new_path = os.path.join(root, str("antechamber"),
-                                    str("retract_svg"), str(file))
+            new_path = os.path.join(root, "antechamber", "retract_svg", file)
             try:
-                shutil.copy(old_path, new_path)
-            except IOError:
-                print("Copy of file '{}' into folder 'retracted_svg' failed.".
+                with open(new_path, mode="wb") as newfile:
+                    newfile.write(read_blob(entry["sha256"], store))
+            except (IOError, lzma.LZMAError):
+                print("Restore of file '{}' into folder 'retract_svg' failed.".
                       format(file))
-                continue
+
+    # or in folder raw_data:
+    else:
+        os.chdir("raw_data")
+        for file, path in svg_paths("."):
+            if str(file) not in register_antechamber:
+                register_retract.append(file)
+
+                old_path = os.path.join(os.getcwd(), path)
+                new_path = os.path.join(root, str("antechamber"),
+                                        str("retract_svg"), str(file))
+                try:
+                    shutil.copy(old_path, new_path)
+                except IOError:
+                    print("Copy of file '{}' into folder 'retracted_svg' "
+                          "failed.".format(file))
+                    continue
 
     register_retract.sort()
     os.chdir(root)
+    note_status(register_retract, "retracted")
 
     # report the results:
     if len(register_retract) == 0:
@@ -273,9 +379,12 @@ def rinse_raw_data():
         print("No access to 'raw_data' of previous harvests.  Exit.")
         sys.exit()
 
+    # in a sharded raw_data, each file is in its shard:
+    layout = read_layout(".")
+
     print("The following instructions will be sent to git")
     for entry in register:
-        command = str("git rm {}".format(entry))
+        command = str("git rm {}".format(plate_path(entry, ".", layout)))
         print("\n{}".format(command))
         try:
             subprocess.call(command, shell=True)
@@ -310,43 +419,64 @@ def rinse_raw_data():
     print("Remove then folder 'retract_svg' in folder 'antechamber'.")
 
 
-# clarifications for argparse, start:
-parser = argparse.ArgumentParser(
-    description='Identify changes in the DEK .svg data since the last update')
-
-group = parser.add_mutually_exclusive_group(required=True)
-group.add_argument(
-    '-n',
-    '--new',
-    action='store_true',
-    help='to start, move apparently new .svg into a separate folder')
-group.add_argument(
-    '-m',
-    '--modified',
-    action='store_true',
-    help='in second place, move modified.svg into a separate folder')
-group.add_argument('-r',
-                   '--retracted',
-                   action='store_true',
-                   help='third, copy .svg to retract into a separate folder')
-group.add_argument(
-    '-R',
-    '--rinse',
-    action='store_true',
-    help=
-    'lastly, remove .svg identified as retracted from both senior folders raw_data and dek_workshop'
-)
-
-args = parser.parse_args()
-# clarifications for argparse, end.
+def get_args():
+    """Clarifications for argparse."""
+    parser = argparse.ArgumentParser(
+        description=
+        'Identify changes in the DEK .svg data since the last update')
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        '-n',
+        '--new',
+        action='store_true',
+        help='to start, move apparently new .svg into a separate folder')
+    group.add_argument(
+        '-m',
+        '--modified',
+        action='store_true',
+        help='in second place, move modified.svg into a separate folder')
+    group.add_argument(
+        '-r',
+        '--retracted',
+        action='store_true',
+        help='third, copy .svg to retract into a separate folder')
+    group.add_argument(
+        '-R',
+        '--rinse',
+        action='store_true',
+        help=
+        'lastly, remove .svg identified as retracted from both senior folders raw_data and dek_workshop'
+    )
+
+    parser.add_argument(
+        '--manifest',
+        default=None,
+        help='compare with this snapshot of dek_store.py instead of raw_data')
+    parser.add_argument(
+        '--archive',
+        default=None,
+        help='read the current harvest from this zip or tar archive (-n, -m)')
+
+    return parser.parse_args()
+
 
 if __name__ == "__main__":
     check_python()
-    if args.new:
-        identify_new_svg()
+    args = get_args()
+    manifest = load_manifest(args.manifest) if args.manifest else None
+    if args.archive and (args.new or args.modified):
+        kind = "new" if args.new else "modified"
+        with measure("delta_{}".format(kind)) as tally:
+            identify_in_archive(args.archive, kind, tally, manifest)
+    elif args.new:
+        with measure("delta_new"):
+            identify_new_svg(manifest)
     elif args.modified:
-        identify_modified_svg()
+        with measure("delta_modified") as tally:
+            identify_modified_svg(tally, manifest)
     elif args.retracted:
-        retracted_svg()
+        with measure("delta_retracted"):
+            retracted_svg(manifest, manifest_store(args.manifest))
     elif args.rinse:
         rinse_raw_data()
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_enumerate.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Enumerate the .svg of the category on Wikimedia Commons directly.
+
+Script `dek_fetch_1.py` reads the addresses of the .svg from a list
+compiled by the Wikimedia download portal; this takes about 1:45 min on
+the server, and the zip archive is to be fetched and unpacked by hand.
+Instead, a call of
+
+python3 dek_enumerate.py [-o addresses.txt] [-j 4]
+
+asks the API of Wikimedia Commons (MediaWiki) for the files of category
+`SVG Deutsche Einheitskurzschrift`, page by page (500 per request, with
+the continuation the API provides).  The category is split by ranges of
+the sort key (e.g., `A DEK`, `B DEK`, ..., and the keywords of set DEK
+by their initial); these ranges are enumerated concurrently.  As the
+pages arrive, the addresses are written into the list of addresses
+(`-o`, to be read by `dek_fetch_1.py`), and the address, size, sha1 and
+dimensions (in pixels) of each file into the manifest (`-m`, one line
+of JSON per file).
+
+For tests without access to Wikimedia, the answers of the API can be
+recorded (`--record folder`), and replayed by a local stand-in server
+
+python3 dek_enumerate.py --replay folder -p 8001
+python3 dek_enumerate.py --api http://127.0.0.1:8001/w/api.php
+
+Wikimedia asks clients to identify themselves by their User-Agent, and
+to retry later if the servers are busy (`maxlag`); both is respected."""
+
+import argparse
+import hashlib
+import json
+import os
+import string
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.error import HTTPError, URLError
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+from urllib.request import Request, urlopen
+
+from dek_catalog import note_rows
+
+API = "https://commons.wikimedia.org/w/api.php"
+CATEGORY = "SVG Deutsche Einheitskurzschrift"
+INFIX = "Deutsche Einheitskurzschrift - Verkehrsschrift - "
+USER_AGENT = ("dek_wikimedia/2026 "
+              "(https://github.com/nbehrnd/dek_wikimedia; nbehrnd@yahoo.com)")
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="list the .svg of the DEK category on Wikimedia Commons",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("-o",
+                        "--output",
+                        metavar="",
+                        default="addresses.txt",
+                        help="write the addresses into this file")
+    parser.add_argument("-m",
+                        "--manifest",
+                        metavar="",
+                        default="addresses.jsonl",
+                        help="write address, size, sha1, dimensions here")
+    parser.add_argument("-c",
+                        "--category",
+                        metavar="",
+                        default=CATEGORY,
+                        help="the category on Wikimedia Commons")
+    parser.add_argument("--api",
+                        metavar="",
+                        default=API,
+                        help="address of the MediaWiki API")
+    parser.add_argument("-j",
+                        "--jobs",
+                        metavar="",
+                        type=int,
+                        default=4,
+                        help="number of concurrent requests")
+    parser.add_argument("--record",
+                        metavar="",
+                        default=None,
+                        help="record the answers of the API in this folder")
+    parser.add_argument("--replay",
+                        metavar="",
+                        default=None,
+                        help="serve the answers recorded in this folder")
+    parser.add_argument("-p",
+                        "--port",
+                        metavar="",
+                        type=int,
+                        default=8001,
+                        help="port of the stand-in server (--replay)")
+
+    return parser.parse_args()
+
+
+def sort_key_ranges():
+    """split the category into ranges of the sort key
+
+    Most of the files are of set DEK and share the leading part of their
+    name; these are split by the initial of the keyword.  Each range is
+    a pair of (start, end), end excluded; None means open."""
+    prefixes = [f"{letter} DEK" for letter in "ABC"]
+    prefixes += [f"DEK {INFIX}{letter}" for letter in string.ascii_uppercase]
+    prefixes += [f"{letter} DEK" for letter in "EFGHIJKLMNOPQRSTUVWXYZ"]
+
+    starts = [None] + prefixes
+    ends = prefixes + [None]
+    return list(zip(starts, ends))
+
+
+def query_key(parameters):
+    """identify a request to the API independent of the order of parameters"""
+    canonical = urlencode(sorted(parameters.items()))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def request(api, parameters, record=None, attempts=5):
+    """send one request to the API, retry if the server is busy"""
+    url = f"{api}?{urlencode(parameters)}"
+    delay = 5
+
+    for _ in range(attempts):
+        try:
+            with urlopen(Request(url, headers={"User-Agent": USER_AGENT}),
+                         timeout=60) as answer:
+                data = answer.read()
+        except HTTPError as error:
+            if error.code not in (429, 500, 502, 503, 504):
+                raise
+            time.sleep(int(error.headers.get("Retry-After", delay)))
+            delay *= 2
+            continue
+        except URLError:
+            time.sleep(delay)
+            delay *= 2
+            continue
+
+        result = json.loads(data)
+        if result.get("error", {}).get("code") == "maxlag":
+            time.sleep(delay)
+            delay *= 2
+            continue
+        if "error" in result:
+            raise RuntimeError(result["error"].get("info", result["error"]))
+
+        if record:
+            with open(os.path.join(record, f"{query_key(parameters)}.json"),
+                      mode="wb") as newfile:
+                newfile.write(data)
+        return result
+
+    raise RuntimeError(f"no answer by the API for {url}")
+
+
+def walk(api, category, start=None, end=None, record=None):
+    """yield the files of a range of the category, page by page"""
+    parameters = {
+        "action": "query",
+        "format": "json",
+        "formatversion": "2",
+        "maxlag": "5",
+        "generator": "categorymembers",
+        "gcmtitle": f"Category:{category}",
+        "gcmtype": "file",
+        "gcmlimit": "500",
+        "prop": "imageinfo",
+        "iiprop": "url|size|sha1|mime"
+    }
+    if start:
+        parameters["gcmstartsortkeyprefix"] = start
+    if end:
+        parameters["gcmendsortkeyprefix"] = end
+
+    continuation = {}
+    while True:
+        result = request(api, dict(parameters, **continuation), record)
+        pages = result.get("query", {}).get("pages", [])
+        yield [describe(page) for page in pages if page.get("imageinfo")]
+
+        if "continue" not in result:
+            break
+        continuation = result["continue"]
+
+
+def describe(page):
+    """condense the answer about one file"""
+    info = page["imageinfo"][0]
+    return {
+        "title": page["title"],
+        "url": info["url"],
+        "size": info.get("size"),
+        "sha1": info.get("sha1"),
+        "width": info.get("width"),
+        "height": info.get("height"),
+        "mime": info.get("mime")
+    }
+
+
+def enumerate_category(api, category, output, manifest, jobs=4, record=None):
+    """enumerate the ranges concurrently, write the results as they arrive"""
+    seen = set()
+    lock = Lock()
+
+    if record:
+        os.makedirs(record, exist_ok=True)
+
+    with open(file=output, mode="wt", encoding="utf-8") as addresses, open(
+            file=manifest, mode="wt", encoding="utf-8") as details:
+
+        def enumerate_range(bounds):
+            count = 0
+            for files in walk(api, category, *bounds, record):
+                with lock:
+                    for entry in files:
+                        if entry["url"] in seen:
+                            continue
+                        seen.add(entry["url"])
+                        addresses.write(f"{entry['url']}\n")
+                        details.write(json.dumps(entry, ensure_ascii=False) +
+                                      "\n")
+                        count += 1
+                    addresses.flush()
+                    details.flush()
+            return count
+
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            counts = list(pool.map(enumerate_range, sort_key_ranges()))
+
+    return sum(counts), seen
+
+
+class Replay(BaseHTTPRequestHandler):
+    """stand-in for the API, answering by the recorded pages"""
+
+    def __init__(self, *args, folder=".", **kwargs):
+        self.folder = folder
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """answer by the recording of the same query"""
+        parameters = dict(parse_qsl(urlsplit(self.path).query))
+        path = os.path.join(self.folder, f"{query_key(parameters)}.json")
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        with open(path, mode="rb") as source:
+            body = source.read()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """keep the console quiet"""
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if args.replay:
+        server = ThreadingHTTPServer(("127.0.0.1", args.port),
+                                     partial(Replay, folder=args.replay))
+        print(f"Replaying `{args.replay}` at "
+              f"http://127.0.0.1:{args.port}/w/api.php (stop by Ctrl+C).")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        return
+
+    start = time.perf_counter()
+    try:
+        number, urls = enumerate_category(args.api, args.category, args.output,
+                                          args.manifest, args.jobs,
+                                          args.record)
+    except (HTTPError, RuntimeError) as error:
+        print(f"Error while asking the API: {error}.  Exit.")
+        sys.exit()
+
+    print(f"{number} addresses written to `{args.output}` in "
+          f"{time.perf_counter() - start:.1f} s; details in "
+          f"`{args.manifest}`.")
+    note_rows(({
+        "name": unquote(url),
+        "url": url
+    } for url in urls if url.endswith(".svg")), args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -42,6 +42,23 @@ the script to
   script is used in an environment other than Linux (e.g. Windows),
   then this requires to add `wget2` into the system's PATH variable.
 
+By option `--prefilter`, plates the later stages discard anyway are
+not downloaded at all:
+
++ plates of sets not white listed for the deck (by the tag in the file
+  name, the list is shared with `dek_csv_4.py`), and
++ if the manifest written by `dek_enumerate.py` is provided (option
+  `-m addresses.jsonl`), plates whose dimension reported by Wikimedia
+  differs from the regular one.  Plates of unknown dimension are kept;
+  the dimension is not checked at all if the one reported most often is
+  not recognized as regular.
+
+They are listed in file `rejected_list.txt`.  The prefilter is off by
+default: folder `raw_data` holds the plates of earlier, complete
+harvests, and `dek_delta.py -r` (then `-R`) would report the plates not
+downloaded as retracted and remove them from `raw_data`.  Hence, use
+the prefilter only for a harvest not to be compared with `raw_data`.
+
 Note: The download includes a default constraint of to 5k .svg per
       run.  Experience shows this is a safer approach to collect the
       files, than all at once.
@@ -52,10 +69,19 @@ Entry in Linux Debian's repositories: https://tracker.debian.org/pkg/wget2
 """
 
 import argparse
+import json
 import os
 import shutil
 import subprocess as sub
 import sys
+from collections import Counter
+from urllib.parse import unquote
+
+from dek_catalog import note_rows, note_status
+from dek_csv_4 import TAGS_WHITE_LIST, is_regular_pixels
+from dek_metrics import measure
+from dek_rename_2 import create_new_name
+from dek_scan import LAYOUT_FILE, place, read_layout, svg_names, svg_paths
 
 
 def get_args():
@@ -77,6 +103,18 @@ def get_args():
         default=5000,
         help="specify the number of .svg to fetch from Wikimedia's servers")
 
+    parser.add_argument(
+        "-m",
+        "--manifest",
+        metavar="",
+        default=None,
+        help="dimensions of the .svg as written by dek_enumerate.py")
+
+    parser.add_argument(
+        "--prefilter",
+        action="store_true",
+        help="skip .svg of sets not white listed, or of another dimension")
+
     return parser.parse_args()
 
 
@@ -121,6 +159,81 @@ def retain_only_svg(listing=None):
     return new_list
 
 
+def read_metadata(name=None):
+    """read the manifest of dek_enumerate.py, keyed by the address"""
+    metadata = {}
+    if name is None:
+        return metadata
+
+    try:
+        with open(file=name, mode="rt", encoding="utf-8") as source:
+            for line in source:
+                if line.strip():
+                    entry = json.loads(line)
+                    metadata[entry["url"]] = entry
+    except OSError:
+        print(f"Error reading file `{name}`.  Exit.")
+        sys.exit()
+
+    return metadata
+
+
+def prefilter(listing=None, metadata=None):
+    """retain only addresses about .svg the deck is going to use
+
+    The tag is derived from the file name after the rename, as later by
+    `whitelist_categories` of dek_csv_4.py; the dimension is checked if
+    the metadata report it.  Most of the plates are regular; thus, if the
+    dimension reported most often is not recognized as the regular one
+    (e.g., by another conversion of mm into pixels), the dimension is not
+    checked at all rather than rejecting the regular plates."""
+    metadata = metadata or {}
+    new_list = []
+    rejected = []
+
+    check_dimension = True
+    sizes = Counter((details.get("width"), details.get("height"))
+                    for details in metadata.values()
+                    if details.get("width") and details.get("height"))
+    if sizes:
+        (width, height), _ = sizes.most_common(1)[0]
+        if not is_regular_pixels(width, height):
+            print(f"The dimension reported most often ({width}x{height} "
+                  "pixels) is not the regular one; the dimension is not "
+                  "checked prior to the download.")
+            check_dimension = False
+
+    for entry in listing:
+        name = create_new_name(unquote(str(entry)).rsplit("/", maxsplit=1)[-1])
+        tag = name.split("+")[0]
+        if tag not in TAGS_WHITE_LIST:
+            rejected.append((entry, f"tag {tag}"))
+            continue
+
+        details = metadata.get(entry, {})
+        width, height = details.get("width"), details.get("height")
+        if (check_dimension and width and height
+                and not is_regular_pixels(width, height)):
+            rejected.append((entry, f"dimension {width}x{height}"))
+            continue
+
+        new_list.append(entry)
+
+    print(f"{len(new_list)} files pass the filter by tag and dimension.")
+    if rejected:
+        try:
+            with open(file="rejected_list.txt", mode="at",
+                      encoding="utf-8") as new:
+                for entry, reason in rejected:
+                    new.write(f"{entry}\t{reason}\n")
+            print(f"See `rejected_list.txt` for {len(rejected)} entries "
+                  "not fetched.")
+        except OSError:
+            print("Error writing file `rejected_list.txt`.")
+
+    return new_list, [entry for entry, _ in rejected]
+
+
 def list2file(listing=None, name=""):
     """record list of files of interest in a file"""
 
@@ -153,14 +266,32 @@ def fetch_svg(name=""):
         sys.exit()
 
 
+def place_into_shards():
+    """move the freshly fetched .svg into shards, if the folder uses them
+
+    wget2 deposits the .svg into the top level of the current working
+    directory.  If the folder is organized in shards (`dek_shard.py`),
+    the new files are moved into the shard they belong to."""
+    layout = read_layout(".")
+    if layout is None:
+        return
+
+    with os.scandir(".") as entries:
+        fresh = [
+            entry.name for entry in entries
+            if entry.name.endswith(".svg") and entry.is_file()
+        ]
+    for file in fresh:
+        place(file, ".", layout)
+
+
 def check_progress():
     """report how many .svg were saved"""
-    counter = 0
-    for file in os.listdir("."):
-        if str(file).endswith(".svg"):
-            counter += 1
+    counter = sum(1 for _ in svg_names("."))
     print(f"\nIn total, {counter} .svg files were collected.")
 
+    return counter
+
 
 def tidy_up(name=""):
     """clear the space for next batch of .svg data"""
@@ -172,12 +303,16 @@ def tidy_up(name=""):
         print(f"\nStop: check first if folder {depot} already exists -- exit.")
         sys.exit()
 
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
-            try:
-                shutil.move(file, depot)
-            except OSError:
-                print(f"transfer of {file} to {depot} failed")
+    for file, path in list(svg_paths(".")):
+        target = os.path.join(depot, os.path.dirname(path))
+        try:
+            os.makedirs(target, exist_ok=True)
+            shutil.move(path, target)
+        except OSError:
+            print(f"transfer of {file} to {depot} failed")
+
+    if os.path.isfile(LAYOUT_FILE):
+        shutil.copy(LAYOUT_FILE, depot)
 
     try:
         shutil.move("svg_of_interest.txt", depot)
@@ -191,10 +326,21 @@ def main():
 
     raw_list = file_read_2(args.file, args.number)
     filtered_list = retain_only_svg(raw_list)
+    if args.prefilter:
+        filtered_list, rejected = prefilter(filtered_list,
+                                            read_metadata(args.manifest))
+        note_status((unquote(entry) for entry in rejected), "rejected")
     list2file(filtered_list, "svg_of_interest.txt")
-
-    fetch_svg("svg_of_interest.txt")
-    check_progress()
+    note_rows(({
+        "name": unquote(entry),
+        "url": entry
+    } for entry in filtered_list), "svg_of_interest.txt")
+
+    with measure("fetch") as tally:
+        fetch_svg("svg_of_interest.txt")
+        place_into_shards()
+        tally["files"] = check_progress()
+    note_status(svg_names("."), "fetched")
 
     tidy_up(args.file.name)
 
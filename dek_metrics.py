@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_metrics.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Timers, throughput, progress and profiles for the scripts' stages.
+
+The scripts of this project report totals once they are done.  For a
+run about 39k .svg lasting hours, this module provides
+
++ `measure`, a context manager timing a stage and recording the number
+  of files and bytes processed, the throughput and the peak resident
+  memory of the process,
++ `progress`, a wrapper around an iterable reporting the progress,
+  the throughput and the estimated time remaining every few seconds
+  (on stderr, thus separate from the scripts' usual reports).
+
+If the environment variable `DEK_METRICS` names a file, one line of
+JSON per stage is appended to it, e.g.
+
+DEK_METRICS=metrics.jsonl python3 dek_csv_4.py dek2anki.csv
+
+and if `DEK_PROFILE` names a folder, each stage is profiled by cProfile
+with the statistics dumped into `<folder>/<stage>.prof` (to be read
+e.g. by `python3 -m pstats`).  Without these variables, the overhead
+is a few calls of `time.perf_counter`."""
+
+import contextlib
+import cProfile
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # e.g., Windows
+    resource = None
+
+
+def peak_rss():
+    """report the peak resident memory of the process in bytes"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kB, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def record(entry, name=None):
+    """append one line of JSON to the metrics file, if there is one"""
+    name = name or os.environ.get("DEK_METRICS")
+    if not name:
+        return
+    try:
+        with open(file=name, mode="at", encoding="utf-8") as newfile:
+            newfile.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    except OSError:
+        print(f"Error writing metrics into `{name}`.", file=sys.stderr)
+
+
+@contextlib.contextmanager
+def measure(stage):
+    """time a stage; the caller adds to `files` and `bytes` of the tally
+
+    Usage:
+
+    with measure("rename") as tally:
+        for file in files:
+            ...
+            tally["files"] += 1
+    """
+    tally = {"files": 0, "bytes": 0}
+    folder = os.environ.get("DEK_PROFILE")
+    profiler = cProfile.Profile() if folder else None
+
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield tally
+    finally:
+        if profiler:
+            profiler.disable()
+            os.makedirs(folder, exist_ok=True)
+            profiler.dump_stats(os.path.join(folder, f"{stage}.prof"))
+        elapsed = time.perf_counter() - start
+
+        record({
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "stage": stage,
+            "seconds": round(elapsed, 4),
+            "files": tally["files"],
+            "bytes": tally["bytes"],
+            "files_per_second":
+            round(tally["files"] / elapsed, 2) if elapsed else None,
+            "bytes_per_second":
+            round(tally["bytes"] / elapsed, 2) if elapsed else None,
+            "peak_rss": peak_rss()
+        })
+
+
+def format_seconds(seconds):
+    """represent a duration as h:mm:ss"""
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+
+def progress(iterable, total=None, stage="", interval=5.0, tally=None):
+    """yield from an iterable, report the progress every interval seconds
+
+    If a tally of `measure` is provided, its count of files is advanced
+    for each item."""
+    if total is None:
+        try:
+            total = len(iterable)
+        except TypeError:
+            total = None
+
+    start = time.perf_counter()
+    last = start
+    count = 0
+
+    for item in iterable:
+        yield item
+        count += 1
+        if tally is not None:
+            tally["files"] += 1
+
+        current = time.perf_counter()
+        if current - last >= interval:
+            last = current
+            rate = count / (current - start)
+            report = f"{stage}: {count}"
+            if total:
+                remaining = (total - count) / rate if rate else 0
+                report += (f"/{total} ({100 * count / total:.1f}%), "
+                           f"{rate:.1f} files/s, "
+                           f"ETA {format_seconds(remaining)}")
+            else:
+                report += f", {rate:.1f} files/s"
+            print(report, file=sys.stderr)
@@ -5,7 +5,7 @@
 # author:  nbehrnd@yahoo.com
 # license: MIT, 2023
 # date:    [2023-06-13 Wed]
-# edit:    [2026-03-24 Tue]
+# edit:    [2026-10-19 Mon]
 #
 # Concept study to moderate svgcleaner.  Deposit both this bash script
 # and the svgcleaner (with provision of the executable bit), and run
@@ -47,15 +47,83 @@ parameters="--quiet --indent none \
   --multipass"
 
 
-for file in *.svg
+# The .svg either are in the current working directory, or (if the folder
+# was organized by `dek_shard.py`) one level below in shards.  Instead of
+# a glob `*.svg` which may exceed the limit of arguments to a command, the
+# files are listed once by find.  As in `dek_scan.py`, only the shards
+# named by the scheme of `dek_layout.json` are searched; folders like
+# `svg_skipped`, `empty_svg` or `quarantine_*` are left alone.
+shards=""
+if [ -f dek_layout.json ]; then
+  scheme=$(sed -n 's/.*"scheme": *"\([a-z]*\)".*/\1/p' dek_layout.json)
+  width=$(sed -n 's/.*"depth": *\([0-9]*\).*/\1/p' dek_layout.json)
+  if [ "$scheme" = "tag" ]; then
+    shards="(([A-Z]_)?DEK|other)"
+  else
+    shards="[0-9a-f]{${width:-2}}"
+  fi
+fi
+listing=$(mktemp)
+if [ -z "$shards" ]; then
+  find . -maxdepth 1 -name '*.svg' -type f -print0 > "$listing"
+else
+  find . -maxdepth 2 -type f -regextype posix-extended \
+    -regex "\./($shards/)?[^/]*\.svg" -print0 > "$listing"
+fi
+
+# Instead of each file name, report progress, throughput and estimated time
+# remaining every 100 files.  If the environment variable DEK_METRICS names
+# a file, a line of JSON about the stage is appended to it (as by the Python
+# scripts, see `dek_metrics.py`).
+total=$(tr -cd '\0' < "$listing" | wc -c)
+
+# the sizes of all listed files by one call of wc, instead of a call of
+# stat per file (i.e. two additional processes per .svg)
+sum_bytes() {
+  size=$(wc -c --files0-from="$1" 2> /dev/null | tail -n 1 | awk '{print $1}')
+  echo "${size:-0}"
+}
+
+count=0
+failed=0
+bytes_in=$(sum_bytes "$listing")
+start=$(date +%s.%N)
+SECONDS=0
+
+while IFS= read -r -d '' file
   do
-  echo "$file"
-  ./svgcleaner $parameters $file -c > "$file".out.svg
-  rm "$file"
-done
+  # a failure of svgcleaner leaves the original .svg as it is
+  if ! ./svgcleaner $parameters "$file" -c > "$file".out.svg; then
+    rm "$file".out.svg
+    failed=$((failed + 1))
+  else
+    # restore the file name
+    mv "$file".out.svg "$file"
+  fi
+
+  count=$((count + 1))
+  if [ $((count % 100)) -eq 0 ] && [ "$SECONDS" -gt 0 ]; then
+    remaining=$(( (total - count) * SECONDS / count ))
+    printf "optimize: %d/%d, %d files/s, ETA %d:%02d:%02d\n" \
+      "$count" "$total" $((count / SECONDS)) $((remaining / 3600)) \
+      $((remaining % 3600 / 60)) $((remaining % 60)) >&2
+  fi
+done < "$listing"
+
+bytes_out=$(sum_bytes "$listing")
+rm "$listing"
 
+elapsed=$(awk -v s="$start" -v e="$(date +%s.%N)" 'BEGIN {printf "%.3f", e - s}')
+echo "optimized $count files, $bytes_in bytes to $bytes_out bytes in ${elapsed} s."
+if [ -n "$DEK_METRICS" ]; then
+  printf '{"date": "%s", "stage": "optimize", "seconds": %s, "files": %d, "bytes": %d, "bytes_out": %d}\n' \
+    "$(date +%Y-%m-%dT%H:%M:%S)" "$elapsed" "$count" "$bytes_in" \
+    "$bytes_out" >> "$DEK_METRICS"
+fi
 
-# restore the file names
-file-rename -- 's/\.out\.svg$//' *.svg
+if [ "$failed" -gt 0 ]; then
+  echo "svgcleaner failed on $failed files, they are left unchanged." >&2
+  exit 1
+fi
 
 # EOF
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_optimize_5d.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Moderate svgcleaner with a record of its effect per plate.
+
+Sibling `dek_optimize_5c.sh` applies svgcleaner with `--multipass` to
+every .svg, and records nothing about the result.  Occasionally, the
+result is an empty .svg; this is only discovered later by script
+`dek_clearance.py`.  Instead, this script (placed with the executable
+svgcleaner into the working directory, then called by
+
+python3 dek_optimize_5d.py [-j 4] [--max-passes 4] [--min-gain 0.01]
+
+from the CLI of Python 3)
+
++ passes each .svg through svgcleaner once, and repeats the passes only
+  while the last one still reduced the size of the file by at least the
+  fraction `--min-gain`; thus, the time of multiple passes is spent only
+  where it pays,
++ checks each result immediately: an empty file, or one which does not
+  parse as SVG, is optimized anew with a safer set of parameters (more
+  digits, no transformations applied to paths, invisible elements kept);
+  if this fails too, the original .svg is kept unchanged,
++ appends for each file the sizes before and after, the number of passes,
+  the set of parameters used and the time spent to `optimize_log.jsonl`,
++ reports the savings by tag.
+
+Several files are processed in parallel (option -j).  By default, the
+.svg of the working directory are optimized in place.  Alternatively,
+
+python3 dek_optimize_5d.py --input harvest.zip --output optimized.tar.xz
+
+reads the .svg from a folder, or a zip or tar archive (`--input`), and
+writes the results (and the .svg kept as they are) directly into a new
+zip or tar archive (`--output`); the input is not altered."""
+
+import argparse
+import itertools
+import json
+import os
+import subprocess as sub
+import sys
+import time
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from dek_archive import archive_writer
+from dek_catalog import note_status
+from dek_metrics import measure, progress
+from dek_scan import svg_contents, svg_paths
+
+# the choice of `dek_optimize_5c.sh`, as far as not yet svgcleaner's default
+PARAMETERS = [
+    "--quiet", "--indent", "none", "--remove-gradient-attributes", "yes",
+    "--apply-transform-to-paths", "yes", "--join-arcto-flags", "yes",
+    "--coordinates-precision", "1", "--properties-precision", "1",
+    "--paths-coordinates-precision", "1", "--list-separator", "space"
+]
+
+# fallback if the result of PARAMETERS is empty or broken
+SAFE_PARAMETERS = [
+    "--quiet", "--indent", "none", "--remove-invisible-elements", "no",
+    "--apply-transform-to-paths", "no", "--coordinates-precision", "3",
+    "--properties-precision", "3", "--paths-coordinates-precision", "3",
+    "--list-separator", "space"
+]
+
+LOG = "optimize_log.jsonl"
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="optimize the .svg with svgcleaner, record the effect",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("-j",
+                        "--jobs",
+                        metavar="",
+                        type=int,
+                        default=os.cpu_count() or 1,
+                        help="number of files to process in parallel")
+    parser.add_argument("--max-passes",
+                        metavar="",
+                        type=int,
+                        default=4,
+                        help="upper limit of passes per file")
+    parser.add_argument("--min-gain",
+                        metavar="",
+                        type=float,
+                        default=0.01,
+                        help="repeat a pass only if the last one saved more")
+    parser.add_argument("--svgcleaner",
+                        metavar="",
+                        default="./svgcleaner",
+                        help="path to the executable of svgcleaner")
+    parser.add_argument("--input",
+                        metavar="",
+                        default=".",
+                        help="read the .svg from this folder or archive")
+    parser.add_argument("--output",
+                        metavar="",
+                        default=None,
+                        help="write into this zip or tar archive, not in place")
+    parser.add_argument("--log",
+                        metavar="",
+                        default=LOG,
+                        help="append the record per file to this file")
+
+    return parser.parse_args()
+
+
+def clean(executable, data, parameters):
+    """pass the content of a .svg once through svgcleaner"""
+    result = sub.run([executable] + parameters + ["-c", "-"],
+                     input=data,
+                     capture_output=True,
+                     check=False)
+    return result.stdout
+
+
+def is_valid(data):
+    """check if the result is a non-empty SVG with some content"""
+    if not data.strip():
+        return False
+    try:
+        root = ET.fromstring(data)
+    except ET.ParseError:
+        return False
+    return root.tag.rsplit("}", 1)[-1] == "svg" and len(root) > 0
+
+
+def optimize(data, executable, max_passes=4, min_gain=0.01):
+    """optimize the content of one .svg
+
+    Returns the result, the number of passes, and the set of parameters
+    used (`default`, `safe`, or `kept` if neither yielded a valid SVG)."""
+    result = clean(executable, data, PARAMETERS)
+    if not is_valid(result):
+        result = clean(executable, data, SAFE_PARAMETERS)
+        if is_valid(result):
+            return result, 1, "safe"
+        return data, 0, "kept"
+
+    passes = 1
+    gain = 1 - len(result) / len(data) if data else 0
+    while passes < max_passes and gain >= min_gain:
+        candidate = clean(executable, result, PARAMETERS)
+        if not is_valid(candidate) or len(candidate) >= len(result):
+            break
+        gain = 1 - len(candidate) / len(result)
+        result = candidate
+        passes += 1
+
+    return result, passes, "default"
+
+
+def process_data(name, data, executable, max_passes, min_gain):
+    """optimize the content of one .svg, report the record and the result"""
+    start = time.perf_counter()
+    result, passes, mode = optimize(data, executable, max_passes, min_gain)
+
+    return {
+        "name": name,
+        "tag": name.split("+")[0],
+        "size_in": len(data),
+        "size_out": len(result),
+        "passes": passes,
+        "mode": mode,
+        "seconds": round(time.perf_counter() - start, 4)
+    }, result
+
+
+def process(name, path, executable, max_passes, min_gain):
+    """optimize one .svg in place, report about it"""
+    with open(path, mode="rb") as source:
+        data = source.read()
+
+    entry, result = process_data(name, data, executable, max_passes,
+                                 min_gain)
+
+    if entry["mode"] != "kept":
+        temporary = f"{path}.out"
+        with open(temporary, mode="wb") as newfile:
+            newfile.write(result)
+        os.replace(temporary, path)
+
+    return entry
+
+
+def optimize_contents(source, pool, executable, max_passes, min_gain,
+                      chunk=64):
+    """yield record and result for the .svg of a folder or an archive
+
+    The .svg are read by one sequential pass and handed to the workers in
+    chunks; thus, only one chunk of an archive is held in memory."""
+    plates = svg_contents(source)
+    while True:
+        batch = list(itertools.islice(plates, chunk))
+        if not batch:
+            return
+        yield from pool.map(
+            lambda plate: process_data(plate[0], plate[1], executable,
+                                       max_passes, min_gain), batch)
+
+
+def report_by_tag(records):
+    """summarize the savings by tag"""
+    groups = defaultdict(list)
+    for entry in records:
+        groups[entry["tag"]].append(entry)
+
+    print(f"{'set':6} {'files':>6} {'kB in':>9} {'kB out':>9} {'saved':>6} "
+          f"{'passes':>6} {'safe':>5} {'kept':>5}")
+    for tag in sorted(groups):
+        group = groups[tag]
+        size_in = sum(entry["size_in"] for entry in group)
+        size_out = sum(entry["size_out"] for entry in group)
+        saved = 100 * (1 - size_out / size_in) if size_in else 0
+        passes = sum(entry["passes"] for entry in group) / len(group)
+        safe = sum(1 for entry in group if entry["mode"] == "safe")
+        kept = sum(1 for entry in group if entry["mode"] == "kept")
+        print(f"{tag:6} {len(group):6} {size_in / 1024:9.1f} "
+              f"{size_out / 1024:9.1f} {saved:5.1f}% {passes:6.2f} "
+              f"{safe:5} {kept:5}")
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if not os.path.isfile(args.svgcleaner):
+        print(f"svgcleaner not found at `{args.svgcleaner}`.  Exit.")
+        sys.exit()
+    executable = os.path.abspath(args.svgcleaner)
+    if not args.output and os.path.isfile(args.input):
+        print("An archive is not optimized in place; see `--output`.  Exit.")
+        sys.exit()
+
+    records = []
+
+    with measure("optimize") as tally, ThreadPoolExecutor(
+            max_workers=args.jobs) as pool, open(
+                file=args.log, mode="at", encoding="utf-8") as log:
+        if args.output:
+            with archive_writer(args.output) as add:
+                jobs = optimize_contents(args.input, pool, executable,
+                                         args.max_passes, args.min_gain,
+                                         4 * args.jobs)
+                for entry, result in progress(jobs,
+                                              stage="optimize",
+                                              tally=tally):
+                    add(entry["name"], result)
+                    tally["bytes"] += entry["size_in"]
+                    log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    records.append(entry)
+        else:
+            plates = list(svg_paths(args.input))
+            jobs = pool.map(
+                lambda plate: process(plate[0], plate[1], executable, args.
+                                      max_passes, args.min_gain), plates)
+            for entry in progress(jobs, len(plates), "optimize", tally=tally):
+                tally["bytes"] += entry["size_in"]
+                log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                records.append(entry)
+
+    report_by_tag(records)
+
+    safe = [entry["name"] for entry in records if entry["mode"] == "safe"]
+    kept = [entry["name"] for entry in records if entry["mode"] == "kept"]
+    if safe:
+        print(f"\n{len(safe)} .svg needed the safer parameters.")
+    if kept:
+        print(f"{len(kept)} .svg could not be optimized and were kept as is;"
+              f" see `{args.log}`.")
+    note_status((entry["name"] for entry in records if entry["mode"] != "kept"),
+                "optimized")
+    note_status(kept, "not optimized")
+
+
+if __name__ == "__main__":
+    main()
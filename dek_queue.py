@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_queue.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Share the optimization (and verification) across several machines.
+
+Passing about 39k .svg through svgcleaner, and comparing the results
+visually with the originals (`dek_verify.py`), is the longest stage of
+the project.  This script distributes the plates as tasks by a queue,
+an SQLite database in a folder shared by the machines involved.  The
+coordinator fills the queue once, e.g.
+
+python3 dek_queue.py --init antechamber --output workshop
+
+and each worker (on this, or on any other machine with access to the
+shared folder, svgcleaner and Python) is started in the shared folder
+(the paths of the queue are relative to it) by
+
+python3 dek_queue.py --work [--verify]
+
+A worker leases a few tasks at a time for `--lease` seconds, renews
+the lease every third of this time (by a thread of its own, thus also
+during a long task), and returns for each plate the sha256 of the
+result written into the output folder, its size and (with `--verify`)
+the scores of the visual comparison.  If a worker is lost, its lease
+expires and the tasks are issued again to another worker; a task
+failing `--attempts` times is marked as failed.  The state of the
+queue is reported by
+
+python3 dek_queue.py --status
+
+and, for a test on one machine, option `--spawn 4` of the coordinator
+starts four worker processes and waits for them.  Note that SQLite's
+locks are reliable on a local file system, but not on every network
+file system; a share by NFS v4 (or SMB with locks) is needed."""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import subprocess as sub
+import sys
+import threading
+import time
+import zlib
+
+from dek_metrics import measure
+from dek_optimize_5d import optimize
+from dek_scan import svg_paths
+from dek_verify import compare
+
+QUEUE = "dek_queue.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    name        TEXT PRIMARY KEY,
+    path        TEXT NOT NULL,
+    output      TEXT NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',
+    worker      TEXT,
+    lease_until REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    result      TEXT,
+    updated     REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until);
+"""
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="distribute the optimization of the .svg to workers",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--init",
+                       metavar="",
+                       help="queue the .svg of this folder")
+    group.add_argument("--work",
+                       action="store_true",
+                       help="work on the tasks of the queue")
+    group.add_argument("--status",
+                       action="store_true",
+                       help="report the state of the queue")
+    group.add_argument("--spawn",
+                       metavar="",
+                       type=int,
+                       help="start this many local workers and wait")
+
+    parser.add_argument("--queue",
+                        metavar="",
+                        default=QUEUE,
+                        help="the database of the queue")
+    parser.add_argument("--output",
+                        metavar="",
+                        default="workshop",
+                        help="folder for the results (--init)")
+    parser.add_argument("--svgcleaner",
+                        metavar="",
+                        default="./svgcleaner",
+                        help="path to the executable of svgcleaner")
+    parser.add_argument("--verify",
+                        action="store_true",
+                        help="compare the results visually, too")
+    parser.add_argument("-b",
+                        "--batch",
+                        metavar="",
+                        type=int,
+                        default=8,
+                        help="number of tasks leased at once")
+    parser.add_argument("--lease",
+                        metavar="",
+                        type=float,
+                        default=120,
+                        help="seconds a lease is valid unless renewed")
+    parser.add_argument("--attempts",
+                        metavar="",
+                        type=int,
+                        default=3,
+                        help="give a task up after this many leases")
+    parser.add_argument("--worker",
+                        metavar="",
+                        default=f"{socket.gethostname()}-{os.getpid()}",
+                        help="name of this worker")
+
+    return parser.parse_args()
+
+
+def open_queue(name=QUEUE):
+    """connect to the queue; writers wait for each other up to a minute"""
+    connection = sqlite3.connect(name, timeout=60, isolation_level=None)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def fill(connection, folder, output):
+    """queue each .svg of a folder, unless already queued"""
+    os.makedirs(output, exist_ok=True)
+    rows = [(name, path, os.path.join(output, name), time.time())
+            for name, path in svg_paths(folder)]
+    connection.execute("BEGIN IMMEDIATE")
+    connection.executemany(
+        "INSERT OR IGNORE INTO tasks (name, path, output, updated) "
+        "VALUES (?, ?, ?, ?)", rows)
+    connection.execute("COMMIT")
+    return len(rows)
+
+
+def lease(connection, worker, batch=8, duration=120, attempts=3):
+    """lease pending tasks, or tasks whose lease expired, to a worker"""
+    now = time.time()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        connection.execute(
+            "UPDATE tasks SET state = 'failed', updated = ? "
+            "WHERE (state = 'pending' OR "
+            "(state = 'leased' AND lease_until < ?)) AND attempts >= ?",
+            (now, now, attempts))
+        rows = connection.execute(
+            "SELECT name, path, output FROM tasks "
+            "WHERE state = 'pending' OR (state = 'leased' AND lease_until < ?) "
+            "ORDER BY name LIMIT ?", (now, batch)).fetchall()
+        connection.executemany(
+            "UPDATE tasks SET state = 'leased', worker = ?, lease_until = ?, "
+            "attempts = attempts + 1, updated = ? WHERE name = ?",
+            [(worker, now + duration, now, row[0]) for row in rows])
+        connection.execute("COMMIT")
+    except sqlite3.Error:
+        connection.execute("ROLLBACK")
+        raise
+    return rows
+
+
+def renew(connection, worker, names, duration=120):
+    """extend the lease of the tasks still held by a worker"""
+    now = time.time()
+    connection.executemany(
+        "UPDATE tasks SET lease_until = ? "
+        "WHERE name = ? AND worker = ? AND state = 'leased'",
+        [(now + duration, name, worker) for name in names])
+
+
+def complete(connection, worker, name, result, state="done"):
+    """return the result of a task, if the lease still is held
+
+    Returns False if the lease meanwhile expired and the task was issued
+    to another worker; the result then is discarded."""
+    cursor = connection.execute(
+        "UPDATE tasks SET state = ?, result = ?, updated = ? "
+        "WHERE name = ? AND worker = ? AND state = 'leased'",
+        (state, json.dumps(result), time.time(), name, worker))
+    return cursor.rowcount == 1
+
+
+def run_task(path, output, executable, verify=False):
+    """optimize one .svg, write the result, describe it"""
+    with open(path, mode="rb") as source:
+        data = source.read()
+
+    result, passes, mode = optimize(data, executable)
+    temporary = f"{output}.{os.getpid()}.tmp"
+    with open(temporary, mode="wb") as newfile:
+        newfile.write(result)
+    os.replace(temporary, output)
+
+    description = {
+        "sha256": hashlib.sha256(result).hexdigest(),
+        "size_in": len(data),
+        "size_out": len(result),
+        "passes": passes,
+        "mode": mode
+    }
+    if verify:
+        try:
+            description.update(compare(path, output))
+        except (OSError, sub.CalledProcessError, ValueError,
+                zlib.error) as error:
+            # e.g., no rasterizer; the result is written nevertheless
+            description["verify_error"] = str(error)
+
+    return description
+
+
+def heartbeat(name, worker, held, lock, stop, duration=120):
+    """renew the leases held every third of their duration, until stopped
+
+    Runs in a thread of its own, with a connection of its own."""
+    connection = open_queue(name)
+    while not stop.wait(duration / 3):
+        with lock:
+            names = list(held)
+        renew(connection, worker, names, duration)
+    connection.close()
+
+
+def work(connection, args):
+    """lease and process tasks until the queue is empty"""
+    executable = os.path.abspath(args.svgcleaner)
+    done = 0
+    held = set()
+    lock = threading.Lock()
+    stop = threading.Event()
+    beat = threading.Thread(target=heartbeat,
+                            args=(args.queue, args.worker, held, lock, stop,
+                                  args.lease),
+                            daemon=True)
+    beat.start()
+
+    try:
+        while True:
+            tasks = lease(connection, args.worker, args.batch, args.lease,
+                          args.attempts)
+            if not tasks:
+                waiting = connection.execute(
+                    "SELECT COUNT(*) FROM tasks WHERE state = 'leased'"
+                ).fetchone()
+                if waiting[0] == 0:
+                    return done
+                # others still work; their leases may expire
+                time.sleep(min(args.lease / 4, 1))
+                continue
+
+            with lock:
+                held.update(task[0] for task in tasks)
+            for name, path, output in tasks:
+                try:
+                    result = run_task(path, output, executable, args.verify)
+                    state = "done"
+                except (OSError, ValueError, sub.SubprocessError) as error:
+                    result = {"error": str(error)}
+                    state = "pending"
+                with lock:
+                    held.discard(name)
+                if complete(connection, args.worker, name, result, state):
+                    done += state == "done"
+    finally:
+        stop.set()
+        beat.join()
+
+
+def report(connection):
+    """summarize the state of the queue"""
+    for state, count in connection.execute(
+            "SELECT state, COUNT(*) FROM tasks GROUP BY state ORDER BY state"):
+        print(f"{state:8} {count:7}")
+
+    rows = connection.execute(
+        "SELECT result FROM tasks WHERE state = 'done'").fetchall()
+    results = [json.loads(row[0]) for row in rows]
+    size_in = sum(result["size_in"] for result in results)
+    size_out = sum(result["size_out"] for result in results)
+    if size_in:
+        print(f"done: {size_in} bytes -> {size_out} bytes "
+              f"({100 * (1 - size_out / size_in):.1f}% saved)")
+    for worker, count in connection.execute(
+            "SELECT worker, COUNT(*) FROM tasks WHERE state = 'done' "
+            "GROUP BY worker ORDER BY worker"):
+        print(f"  {worker}: {count}")
+
+
+def spawn(number, args):
+    """start local workers, wait for them to finish"""
+    command = [
+        sys.executable,
+        os.path.abspath(__file__), "--work", "--queue", args.queue,
+        "--svgcleaner", args.svgcleaner, "--batch",
+        str(args.batch), "--lease",
+        str(args.lease), "--attempts",
+        str(args.attempts)
+    ]
+    if args.verify:
+        command.append("--verify")
+
+    workers = [
+        sub.Popen(command + ["--worker", f"{args.worker}-{index}"])
+        for index in range(number)
+    ]
+    return [worker.wait() for worker in workers]
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+    connection = open_queue(args.queue)
+
+    if args.init:
+        number = fill(connection, args.init, args.output)
+        print(f"{number} .svg of `{args.init}` queued in `{args.queue}`.")
+
+    elif args.work:
+        if not os.path.isfile(args.svgcleaner):
+            print(f"svgcleaner not found at `{args.svgcleaner}`.  Exit.")
+            sys.exit()
+        with measure("queue_work") as tally:
+            tally["files"] = work(connection, args)
+        print(f"Worker {args.worker}: {tally['files']} tasks done.")
+
+    elif args.spawn:
+        with measure("queue_spawn"):
+            spawn(args.spawn, args)
+        report(connection)
+
+    elif args.status:
+        report(connection)
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
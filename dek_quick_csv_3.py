@@ -26,32 +26,58 @@ Anki permits only UTF-8 encoded relational tables and some file names
 contain special characters (e.g., umlauts).  Thus, the script's action
 is constrained to Python 3.
 
+With option `--bundle`, the file names are read from the index of the
+bundle written by dek_bundle.py instead of the working directory.  With
+option `--source harvest.zip`, they are read from a zip or tar archive
+of the harvest (and named as after the rename by dek_rename_2.py).
+
 Note, file 'csv2anki.csv' actually is used as mandatory parameter by
 script dek_csv4.py to extend the file indexing to be accessed again."""
 
 import argparse
-import os
 import sys
 
 from datetime import date
 
+from dek_archive import is_archive
+from dek_bundle import BUNDLE, read_index
+from dek_metrics import measure
+from dek_records import Record, write_records
+from dek_rename_2 import create_new_name
+from dek_scan import svg_names
+
 
 def get_args():
     """read the arguments by the CLI"""
     parser = argparse.ArgumentParser(
         description="Write an initial dek2Anki.csv about Wikimedia DEK .svg")
 
+    parser.add_argument("--bundle",
+                        metavar="",
+                        nargs="?",
+                        const=BUNDLE,
+                        default=None,
+                        help="read the file names from this bundle")
+    parser.add_argument("--source",
+                        metavar="",
+                        default=".",
+                        help="folder, or zip / tar archive of the .svg")
+
     return parser.parse_args()
 
 
-def tally_files():
+def tally_files(bundle=None, source="."):
     """identify the files the preliminary Anki deck could cover"""
-    register = []
-
-    for file in os.listdir("."):
-        if file.endswith(".svg"):
-            register.append(file)
-
+    if bundle is not None:
+        index = read_index(bundle)
+        if index is None:
+            print(f"There is no bundle `{bundle}`.  Exit.")
+            sys.exit()
+        register = list(index)
+    elif is_archive(source):
+        register = [create_new_name(name) for name in svg_names(source)]
+    else:
+        register = list(svg_names(source))
     register.sort(key=str.lower)
     return register
 
@@ -66,21 +92,17 @@ def create_csv(file_register):
         keyword = str(entry).rsplit('+', maxsplit=1)[-1]
         keyword = str(keyword)[:-4]
 
-        retain = str(f'{keyword}; <img src="{file_name}">')
-        csv_register.append(retain)
+        csv_register.append(Record(keyword, file_name))
+
+    header = {
+        "file": "dek2anki.csv",
+        "date": f"{date.today()} (YYYY-MM-DD)",
+        "data": len(csv_register)
+    }
 
     try:
-        with open("dek2anki.csv", mode="w", encoding="utf-8") as newfile:
-            header = ""
-            header = str("# file: dek2anki.csv\n")
-            header += str(f"# date: {date.today()} (YYYY-MM-DD)\n")
-            header += str(f"# data: {len(csv_register)}\n#\n")
-            newfile.write(header)
-
-            for record in csv_register:
-                keep = str(f"{record}\n")
-                newfile.write(keep)
-            print("File 'dek2anki.csv' was written.")
+        write_records("dek2anki.csv", csv_register, header)
+        print("File 'dek2anki.csv' was written.")
     except IOError:
         print("Error writing file 'dek2anki.csv'.  Exit.")
         sys.exit()
@@ -88,9 +110,11 @@ def create_csv(file_register):
 
 def main():
     """join the functionalites"""
-    get_args()
-    register = tally_files()
-    create_csv(register)
+    args = get_args()
+    with measure("csv") as tally:
+        register = tally_files(args.bundle, args.source)
+        create_csv(register)
+        tally["files"] = len(register)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_records.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Read and write the relational tables dek2anki.csv / revised_anki4dek.csv.
+
+Both tables share a pattern of
+
+Aufstand; <img src="DEK+Aufstand.svg">; DEK
+
+i.e., a keyword, the reference to the .svg, and (in the revised table)
+the tags, separated by semicolon and space.  Optionally, the table
+starts with a header of comment lines like
+
+# file: dek2anki.csv
+# date: 2020-05-31 (YYYY-MM-DD)
+# data: 38118
+#
+
+Keywords (or file names) may contain a semicolon, or start with a
+double quote or a hash.  Such a field is enclosed in double quotes, with double
+quotes inside the field doubled, as Anki's import of .csv expects it.
+The table is read line by line; thus the memory required does not
+depend on the size of the table."""
+
+import os
+import re
+import shutil
+import tempfile
+from collections import namedtuple
+
+Record = namedtuple("Record", ["keyword", "image", "tags"], defaults=[()])
+
+IMAGE_PATTERN = re.compile(r'<img src="(.*)">')
+
+
+def split_fields(line):
+    """split a line of the table into its fields"""
+    fields = []
+    position = 0
+    length = len(line)
+
+    while position <= length:
+        while position < length and line[position] == " ":
+            position += 1
+
+        if position < length and line[position] == '"':
+            position += 1
+            field = []
+            while position < length:
+                if line[position] == '"':
+                    if line[position + 1:position + 2] == '"':
+                        field.append('"')
+                        position += 2
+                        continue
+                    position += 1
+                    break
+                field.append(line[position])
+                position += 1
+            fields.append("".join(field))
+            end = line.find(";", position)
+        else:
+            end = line.find(";", position)
+            stop = length if end == -1 else end
+            fields.append(line[position:stop].rstrip())
+
+        if end == -1:
+            break
+        position = end + 1
+
+    return fields
+
+
+def quote(field):
+    """enclose a field in double quotes, if necessary"""
+    if ";" in field or "\n" in field or field.startswith(('"', "#")):
+        return '"' + field.replace('"', '""') + '"'
+    return field
+
+
+def parse_record(line):
+    """convert a line of the table into a Record"""
+    fields = split_fields(line.rstrip("\r\n"))
+    match = IMAGE_PATTERN.fullmatch(fields[1])
+    image = match.group(1) if match else fields[1]
+    tags = tuple(fields[2].split()) if len(fields) > 2 else ()
+
+    return Record(fields[0], image, tags)
+
+
+def format_record(record):
+    """convert a Record into a line of the table (without line break)"""
+    fields = [quote(record.keyword), quote(f'<img src="{record.image}">')]
+    if record.tags:
+        fields.append(quote(" ".join(record.tags)))
+
+    return "; ".join(fields)
+
+
+def read_records(name, header=None):
+    """yield the Records of a table, one by one
+
+    Comment lines of the header are parsed into dictionary `header` (if
+    one is provided) in a pattern of `# key: value`."""
+    in_header = True
+
+    with open(file=name, mode="rt", encoding="utf-8") as source:
+        for line in source:
+            if in_header and line.startswith("#"):
+                if header is not None and ":" in line:
+                    key, value = line[1:].split(":", maxsplit=1)
+                    header[key.strip()] = value.strip()
+                continue
+            if not line.strip():
+                continue
+            in_header = False
+            yield parse_record(line)
+
+
+def write_records(name, records, header=None):
+    """write Records into a table, optionally preceded by a header
+
+    The table is written into a temporary file first which then replaces a
+    table of the same name; thus an interruption never leaves a truncated
+    table behind.  Returns the number of Records written."""
+    counter = 0
+    folder = os.path.dirname(os.path.abspath(name))
+
+    with tempfile.NamedTemporaryFile(mode="wt",
+                                     encoding="utf-8",
+                                     dir=folder,
+                                     delete=False) as new:
+        if header:
+            for key, value in header.items():
+                new.write(f"# {key}: {value}\n")
+            new.write("#\n")
+        for record in records:
+            new.write(f"{format_record(record)}\n")
+            counter += 1
+
+    if os.path.isfile(name):
+        shutil.copymode(name, new.name)
+    else:
+        mask = os.umask(0)
+        os.umask(mask)
+        os.chmod(new.name, 0o666 & ~mask)
+    os.replace(new.name, name)
+
+    return counter
@@ -33,6 +33,9 @@ import os
 import re
 import shutil
 
+from dek_metrics import measure, progress
+from dek_scan import plate_path, read_layout, svg_paths
+
 
 def get_args():
     """ read the command line arguments """
@@ -55,11 +58,16 @@ def main():
     """join the actions"""
     get_args()
 
-    for file in os.listdir("."):
-        if str(file).endswith(".svg"):
+    layout = read_layout(".")
+
+    with measure("rename") as tally:
+        for file, path in progress(list(svg_paths(".")),
+                                   stage="rename",
+                                   tally=tally):
             try:
-                print(f"Work on: {file}")
-                shutil.move(file, create_new_name(file))
+                target = plate_path(create_new_name(file), ".", layout)
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                shutil.move(path, target)
             except OSError:
                 print(f"Error while working on {file}.")
 
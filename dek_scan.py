@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_scan.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Shared scan of a folder about the .svg plates of DEK.
+
+The scripts of this project each need to know which .svg are present
+in the current working directory.  With about 39k files per harvest,
+repeated calls of `os.listdir` followed by `os.path.getsize` per file
+are expensive.  This module reads a folder once by `os.scandir` which
+already reports the type of an entry; size and time of modification
+are requested only where a script needs them.
+
+Besides its use as a module, the script can be called from the CLI
+by a pattern of
+
+python3 dek_scan.py [folder] [-o snapshot.json]
+
+to report the number and cumulative size of the .svg in the folder,
+and optionally to retain this information as a snapshot (JSON) to be
+read again by function `load_snapshot`.
+
+Optionally, the .svg of a folder are not kept flat, but distributed
+into sub folders (shards) either by their tag (e.g., `G_DEK`), or by
+the leading characters of a md5 checksum of the keyword.  A folder is
+sharded if it contains file `dek_layout.json` (written by script
+`dek_shard.py`); the functions below then read the shards instead of
+the top level of the folder.  Because Anki's media folder is flat,
+the shards are exported into one folder only at packaging time.
+
+In place of a folder, a zip or tar archive of a harvest is read by the
+functions `svg_names`, `svg_contents`, `scan_svg` and `snapshot` (see
+`dek_archive.py`)."""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import shutil
+import sys
+from collections import namedtuple
+
+from dek_archive import archive_entries, archive_members, is_archive
+
+Plate = namedtuple("Plate", ["name", "size", "mtime", "path"],
+                   defaults=[None])
+
+LAYOUT_FILE = "dek_layout.json"
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="scan a folder for .svg, optionally keep a snapshot",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("folder",
+                        nargs="?",
+                        default=".",
+                        help="the folder (or zip / tar archive) to scan")
+
+    parser.add_argument("-o",
+                        "--output",
+                        metavar="",
+                        default=None,
+                        help="write the snapshot into this JSON file")
+
+    return parser.parse_args()
+
+
+def read_layout(path="."):
+    """report the layout of a folder, or None if the folder is flat"""
+    try:
+        with open(file=os.path.join(path, LAYOUT_FILE),
+                  mode="rt",
+                  encoding="utf-8") as source:
+            return json.load(source)
+    except FileNotFoundError:
+        return None
+
+
+def shard_of(name, layout):
+    """name the shard (sub folder) a .svg belongs to
+
+    By scheme `tag`, the shard is the set prefix of the file name which
+    is the same prior to and after the rename by `dek_rename_2.py`.  By
+    scheme `hash`, the shard are the leading characters of the md5sum of
+    the keyword (the file name past the last `+` or `_-_`)."""
+    if layout["scheme"] == "tag":
+        match = re.match(r"([A-Z]_)?DEK", name)
+        return match.group(0) if match else "other"
+
+    keyword = re.split(r"\+|_-_", name)[-1]
+    digest = hashlib.md5(keyword.encode("utf-8")).hexdigest()
+    return digest[:int(layout.get("depth", 2))]
+
+
+def is_shard(folder, layout):
+    """check if a sub folder is a shard rather than e.g. `svg_skipped`"""
+    if layout["scheme"] == "tag":
+        return re.fullmatch(r"([A-Z]_)?DEK|other", folder) is not None
+    return re.fullmatch(f"[0-9a-f]{{{int(layout.get('depth', 2))}}}",
+                        folder) is not None
+
+
+def plate_path(name, path=".", layout=None):
+    """report where a .svg is (or is to be) stored in a folder"""
+    if layout is None:
+        return os.path.join(path, name)
+    return os.path.join(path, shard_of(name, layout), name)
+
+
+def place(name, path=".", layout=None):
+    """move a .svg from the top level of a folder into its shard"""
+    target = plate_path(name, path, layout)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    shutil.move(os.path.join(path, name), target)
+    return target
+
+
+def _svg_entries(path="."):
+    """yield the directory entries about .svg, shards included"""
+    layout = read_layout(path)
+
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".svg") and entry.is_file():
+                yield entry
+            elif layout is not None and entry.is_dir() and is_shard(
+                    entry.name, layout):
+                with os.scandir(entry.path) as shard:
+                    for item in shard:
+                        if item.name.endswith(".svg") and item.is_file():
+                            yield item
+
+
+def svg_names(path="."):
+    """yield the names of the .svg in a folder
+
+    The type of an entry is known from the read of the directory itself,
+    hence no additional system call per file is issued."""
+    if is_archive(path):
+        for name, _, _ in archive_entries(path):
+            yield name
+        return
+
+    for entry in _svg_entries(path):
+        yield entry.name
+
+
+def svg_paths(path="."):
+    """yield name and path of the .svg in a folder"""
+    for entry in _svg_entries(path):
+        yield entry.name, entry.path
+
+
+def svg_contents(path="."):
+    """yield name and content of the .svg in a folder, or in an archive"""
+    if is_archive(path):
+        yield from archive_members(path)
+        return
+
+    for entry in _svg_entries(path):
+        with open(entry.path, mode="rb") as source:
+            yield entry.name, source.read()
+
+
+def scan_svg(path="."):
+    """yield name, size and time of modification of the .svg in a folder"""
+    if is_archive(path):
+        for name, size, mtime in archive_entries(path):
+            yield Plate(name, size, mtime)
+        return
+
+    for entry in _svg_entries(path):
+        stat = entry.stat()
+        yield Plate(entry.name, stat.st_size, stat.st_mtime, entry.path)
+
+
+def snapshot(path="."):
+    """map the name of each .svg in a folder to its Plate record"""
+    return {plate.name: plate for plate in scan_svg(path)}
+
+
+def save_snapshot(register, name="snapshot.json"):
+    """retain a snapshot as permanent record"""
+    try:
+        with open(file=name, mode="wt", encoding="utf-8") as newfile:
+            json.dump([list(plate) for plate in register.values()],
+                      newfile,
+                      ensure_ascii=False)
+    except OSError:
+        print(f"Error writing snapshot {name}.  Exit.")
+        sys.exit()
+
+
+def load_snapshot(name="snapshot.json"):
+    """read a snapshot written earlier by save_snapshot"""
+    with open(file=name, mode="rt", encoding="utf-8") as source:
+        return {entry[0]: Plate(*entry) for entry in json.load(source)}
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    register = snapshot(args.folder)
+    total = sum(plate.size for plate in register.values())
+    print(f"{len(register)} .svg files, {total} bytes in total.")
+
+    if args.output:
+        save_snapshot(register, args.output)
+        print(f"Snapshot written to `{args.output}`.")
+
+
+if __name__ == "__main__":
+    main()
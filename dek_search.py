@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_search.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Search the keywords of the deck.
+
+Instead of grepping `revised_anki4dek.csv`, the keywords and tags known
+to the catalog (`dek_catalog.py`) are indexed by SQLite's full text
+search (FTS5).  Beside the keyword and the tag, the index retains the
+consonant groups and Kuerzel (see `dek_csv_4.py`) the keyword contains.
+Once the index is built (or rebuilt after an update of the catalog) by
+
+python3 dek_search.py --build [revised_anki4dek.csv]
+
+(where the optional .csv is imported into the catalog first) queries
+in a pattern of
+
+python3 dek_search.py Haus              # words of the keyword
+python3 dek_search.py -p Hau            # keywords with a word starting so
+python3 dek_search.py -s aush           # keywords containing the string
+python3 dek_search.py -f Hauss          # similar keywords, best first
+python3 dek_search.py -t schl --tag G_DEK  # by consonant group and tag
+
+report the matching plates, e.g. to check if a word already is
+symbolized.  Search for substrings (and the preselection of similar
+keywords) uses an index of trigrams; SQLite prior to version 3.34
+lacks it, then a (slower) scan of the catalog is used instead."""
+
+import argparse
+import difflib
+import sqlite3
+import sys
+
+from dek_catalog import CATALOG, import_csv, open_catalog
+from dek_csv_4 import GROUPED_CONSONANTS, KUERZEL
+
+SCHEMA = """
+DROP TABLE IF EXISTS search_words;
+DROP TABLE IF EXISTS search_trigrams;
+CREATE VIRTUAL TABLE search_words USING fts5 (
+    name UNINDEXED, keyword, tag, tokens,
+    tokenize = "unicode61 remove_diacritics 0", prefix = "2 3"
+);
+"""
+
+SCHEMA_TRIGRAMS = """
+CREATE VIRTUAL TABLE search_trigrams USING fts5 (
+    name UNINDEXED, keyword, tokenize = "trigram"
+);
+"""
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="search the keywords of the DEK deck",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("term", nargs="?", default=None, help="to search")
+
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--build",
+                       nargs="?",
+                       const="",
+                       metavar="csv",
+                       help="(re)build the index, optionally import a .csv")
+    group.add_argument("-p",
+                       "--prefix",
+                       action="store_true",
+                       help="match words starting with the term")
+    group.add_argument("-s",
+                       "--substring",
+                       action="store_true",
+                       help="match keywords containing the term")
+    group.add_argument("-f",
+                       "--fuzzy",
+                       action="store_true",
+                       help="match keywords similar to the term")
+    group.add_argument("-t",
+                       "--token",
+                       action="store_true",
+                       help="match a consonant group or Kuerzel")
+
+    parser.add_argument("--tag", metavar="", help="restrict to this tag")
+    parser.add_argument("-n",
+                        "--limit",
+                        metavar="",
+                        type=int,
+                        default=25,
+                        help="report at most this many plates")
+    parser.add_argument("--catalog",
+                        metavar="",
+                        default=CATALOG,
+                        help="the database file")
+
+    return parser.parse_args()
+
+
+def derived_tokens(keyword):
+    """list the consonant groups and Kuerzel the keyword contains"""
+    test = str(keyword).lower()
+    return sorted({
+        element
+        for element in GROUPED_CONSONANTS + KUERZEL if element in test
+    })
+
+
+def has_trigrams(connection):
+    """check if the index of trigrams is available"""
+    return connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE name = 'search_trigrams'").fetchone(
+        ) is not None
+
+
+def build_index(connection):
+    """fill the index from the plates of the catalog with a keyword"""
+    connection.executescript(SCHEMA)
+    try:
+        connection.executescript(SCHEMA_TRIGRAMS)
+        trigrams = True
+    except sqlite3.OperationalError:
+        trigrams = False
+
+    rows = connection.execute(
+        "SELECT name, keyword, tag FROM plates WHERE keyword IS NOT NULL"
+    ).fetchall()
+    with connection:
+        connection.executemany(
+            "INSERT INTO search_words (name, keyword, tag, tokens) "
+            "VALUES (?, ?, ?, ?)",
+            ((name, keyword, tag or "", " ".join(derived_tokens(keyword)))
+             for name, keyword, tag in rows))
+        if trigrams:
+            connection.executemany(
+                "INSERT INTO search_trigrams (name, keyword) VALUES (?, ?)",
+                ((name, keyword) for name, keyword, _ in rows))
+
+    print(f"{len(rows)} keywords indexed.")
+
+
+def phrase(term):
+    """quote a term for a query by FTS5"""
+    return '"' + str(term).replace('"', '""') + '"'
+
+
+def restrict(statement, parameters, tag, limit):
+    """complete a query by the restriction to a tag and a limit"""
+    if tag:
+        statement += " AND tag = ?"
+        parameters.append(tag)
+    statement += " ORDER BY rank LIMIT ?"
+    parameters.append(limit)
+    return statement, parameters
+
+
+def search_words(connection, term, tag=None, limit=25, prefix=False):
+    """match words of the keyword, optionally by their start"""
+    query = " ".join(
+        phrase(word) + ("*" if prefix else "") for word in str(term).split())
+    statement, parameters = restrict(
+        "SELECT name, keyword, tag FROM search_words "
+        "WHERE search_words MATCH ?", [f"keyword : ({query})"], tag, limit)
+    return connection.execute(statement, parameters).fetchall()
+
+
+def search_token(connection, term, tag=None, limit=25):
+    """match the consonant groups and Kuerzel derived from a keyword"""
+    statement, parameters = restrict(
+        "SELECT name, keyword, tag FROM search_words "
+        "WHERE search_words MATCH ?", [f"tokens : {phrase(term)}"], tag,
+        limit)
+    return connection.execute(statement, parameters).fetchall()
+
+
+def search_substring(connection, term, tag=None, limit=25):
+    """match keywords containing a string (case insensitive)"""
+    if has_trigrams(connection) and len(term) >= 3:
+        statement = ("SELECT t.name, t.keyword, p.tag FROM search_trigrams t "
+                     "JOIN plates p ON p.name = t.name "
+                     "WHERE search_trigrams MATCH ?")
+        parameters = [f"keyword : {phrase(term)}"]
+        if tag:
+            statement += " AND p.tag = ?"
+            parameters.append(tag)
+        statement += " ORDER BY t.rank LIMIT ?"
+        parameters.append(limit)
+    else:
+        statement = ("SELECT name, keyword, tag FROM plates "
+                     "WHERE keyword LIKE ? ESCAPE '\\'")
+        escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace(
+            "_", "\\_")
+        parameters = [f"%{escaped}%"]
+        if tag:
+            statement += " AND tag = ?"
+            parameters.append(tag)
+        statement += " ORDER BY keyword LIMIT ?"
+        parameters.append(limit)
+
+    return connection.execute(statement, parameters).fetchall()
+
+
+def search_fuzzy(connection, term, tag=None, limit=25):
+    """match keywords similar to the term, the most similar first
+
+    The keywords sharing most trigrams with the term are preselected by
+    the index, then ranked by difflib's ratio of similarity."""
+    if has_trigrams(connection) and len(term) >= 3:
+        lowered = term.lower()
+        grams = {lowered[i:i + 3] for i in range(len(lowered) - 2)}
+        query = " OR ".join(phrase(gram) for gram in sorted(grams))
+        candidates = connection.execute(
+            "SELECT t.name, t.keyword, p.tag FROM search_trigrams t "
+            "JOIN plates p ON p.name = t.name "
+            "WHERE search_trigrams MATCH ? ORDER BY t.rank LIMIT 500",
+            [f"keyword : ({query})"]).fetchall()
+    else:
+        candidates = connection.execute(
+            "SELECT name, keyword, tag FROM plates WHERE keyword IS NOT NULL"
+        ).fetchall()
+
+    if tag:
+        candidates = [entry for entry in candidates if entry[2] == tag]
+
+    matcher = difflib.SequenceMatcher()
+    matcher.set_seq2(term.lower())
+    scored = []
+    for entry in candidates:
+        matcher.set_seq1(entry[1].lower())
+        if matcher.real_quick_ratio() >= 0.6 and matcher.ratio() >= 0.6:
+            scored.append((matcher.ratio(), entry))
+    scored.sort(key=lambda item: (-item[0], item[1][1]))
+
+    return [entry for _, entry in scored[:limit]]
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    connection = open_catalog(args.catalog)
+    if connection is None:
+        print(f"There is no catalog `{args.catalog}`, see dek_catalog.py.")
+        sys.exit()
+
+    if args.build is not None:
+        if args.build:
+            import_csv(connection, args.build)
+        build_index(connection)
+        connection.close()
+        return
+
+    if not args.term:
+        print("Provide a term to search for.")
+        sys.exit()
+
+    try:
+        if args.prefix:
+            results = search_words(connection, args.term, args.tag,
+                                   args.limit, True)
+        elif args.substring:
+            results = search_substring(connection, args.term, args.tag,
+                                       args.limit)
+        elif args.fuzzy:
+            results = search_fuzzy(connection, args.term, args.tag, args.limit)
+        elif args.token:
+            results = search_token(connection, args.term, args.tag,
+                                   args.limit)
+        else:
+            results = search_words(connection, args.term, args.tag,
+                                   args.limit)
+    except sqlite3.OperationalError:
+        print("The index is missing; build it first by --build.")
+        sys.exit()
+
+    for name, keyword, tag in results:
+        print(f"{tag or '':6} {keyword:30} {name}")
+    print(f"{len(results)} plate(s) found.")
+
+    connection.close()
+
+
+if __name__ == "__main__":
+    main()
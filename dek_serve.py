@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_serve.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Browse the plates in a web browser, page by page.
+
+The review of folders like `svg_skipped`, `antechamber/new_svg`,
+`antechamber/modified_svg` or `antechamber/retract_svg` with a file
+manager is slow once they hold thousands of .svg.  Started in the
+working directory by
+
+python3 dek_serve.py [-p 8000] [--per-page 120]
+
+this script serves a gallery at http://localhost:8000 which lists the
+plates of the catalog (`dek_catalog.py`) filtered by tag, status (e.g.,
+new, modified, retracted, skipped) and dimension (regular, i.e. DIN A4
+landscape, other, or unknown), for instance
+
+http://localhost:8000/?tag=G_DEK&status=new&page=2
+
+The images are loaded by the browser only once scrolled into view.
+The .svg are searched in the working directory (shards included) and
+the folders named above, where the file name prior to the rename by
+`dek_rename_2.py` is recognized, too.  Without a catalog, the gallery
+lists the .svg of these folders.  Responses are compressed by gzip if
+the browser accepts it; each .svg carries an ETag (its md5sum), hence
+the browser only reloads plates which changed.
+
+The server only listens on the local machine (option `--host` to
+change this) and only is meant for the review, not for publication."""
+
+import argparse
+import gzip
+import hashlib
+import html
+import os
+import sys
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock
+from urllib.parse import parse_qs, quote, unquote, urlencode, urlsplit
+
+from dek_catalog import CATALOG, open_catalog
+from dek_rename_2 import create_new_name
+from dek_scan import svg_paths
+
+FOLDERS = [
+    ".", "svg_skipped", "empty_svg", "antechamber/new_svg",
+    "antechamber/modified_svg", "antechamber/retract_svg", "antechamber"
+]
+
+DIMENSIONS = ["regular", "other", "unknown"]
+
+PAGE = """<!DOCTYPE html>
+<html lang="de">
+<head>
+<meta charset="utf-8">
+<title>DEK plates</title>
+<style>
+body {{ font-family: sans-serif; margin: 1em; }}
+form, nav {{ margin-bottom: 1em; }}
+.gallery {{ display: grid; gap: 8px;
+           grid-template-columns: repeat(auto-fill, minmax(240px, 1fr)); }}
+figure {{ margin: 0; border: 1px solid #ccc; padding: 4px; }}
+img {{ width: 100%; height: auto; aspect-ratio: 297 / 210; }}
+figcaption {{ font-size: small; overflow-wrap: anywhere; }}
+</style>
+</head>
+<body>
+<form method="get">
+tag <input name="tag" value="{tag}" size="6">
+status <input name="status" value="{status}" size="10">
+dimension <select name="dimension">{dimensions}</select>
+<input type="submit" value="filter">
+</form>
+<nav>{navigation}</nav>
+<div class="gallery">
+{figures}
+</div>
+<nav>{navigation}</nav>
+</body>
+</html>
+"""
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="serve a gallery of the plates for the review",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("-p",
+                        "--port",
+                        metavar="",
+                        type=int,
+                        default=8000,
+                        help="port to listen to")
+    parser.add_argument("--host",
+                        metavar="",
+                        default="127.0.0.1",
+                        help="address to listen to")
+    parser.add_argument("--per-page",
+                        metavar="",
+                        type=int,
+                        default=120,
+                        help="number of plates per page")
+    parser.add_argument("--rescan",
+                        metavar="",
+                        type=float,
+                        default=10.0,
+                        help="seconds between two scans for missing plates")
+    parser.add_argument("--catalog",
+                        metavar="",
+                        default=CATALOG,
+                        help="the database file")
+
+    return parser.parse_args()
+
+
+class Locator:
+    """find the file of a plate in the folders to review
+
+    The folders are scanned once; a plate not found triggers a new scan
+    because files are moved between the folders during the review.  As
+    the catalog lists many plates not on the disk, the folders are scanned
+    at most once per interval, and the plates missing since the last scan
+    are remembered."""
+
+    def __init__(self, folders, interval=10.0):
+        self.folders = folders
+        self.interval = interval
+        self.paths = {}
+        self.misses = set()
+        self.scanned = 0.0
+        self.lock = Lock()
+        self.rescan()
+
+    def rescan(self):
+        """map the (new) name of each plate to its path"""
+        paths = {}
+        for folder in reversed(self.folders):
+            if os.path.isdir(folder):
+                for name, path in svg_paths(folder):
+                    paths[create_new_name(name)] = path
+        self.paths = paths
+        self.misses = set()
+        self.scanned = time.monotonic()
+
+    def locate(self, name):
+        """report the path of a plate, or None"""
+        path = self.paths.get(name)
+        if path is not None and os.path.isfile(path):
+            return path
+        if (name in self.misses
+                and time.monotonic() - self.scanned < self.interval):
+            return None
+
+        with self.lock:
+            if time.monotonic() - self.scanned >= self.interval:
+                self.rescan()
+            path = self.paths.get(name)
+            if path is None or not os.path.isfile(path):
+                self.misses.add(name)
+                return None
+        return path
+
+
+def plate_filter(tag=None, status=None, dimension=None):
+    """the condition of SQL and its parameters about the filter"""
+    conditions, parameters = [], []
+
+    if tag:
+        conditions.append("tag = ?")
+        parameters.append(tag)
+    if status:
+        conditions.append("status = ?")
+        parameters.append(status)
+    if dimension == "regular":
+        conditions.append("width = '297mm' AND height = '210mm'")
+    elif dimension == "other":
+        conditions.append("width IS NOT NULL AND NOT "
+                          "(width = '297mm' AND height = '210mm')")
+    elif dimension == "unknown":
+        conditions.append("width IS NULL")
+
+    if not conditions:
+        return "", parameters
+    return " WHERE " + " AND ".join(conditions), parameters
+
+
+def count_plates(connection, tag=None, status=None, dimension=None):
+    """count the plates matching the filter"""
+    condition, parameters = plate_filter(tag, status, dimension)
+    return connection.execute("SELECT COUNT(*) FROM plates" + condition,
+                              parameters).fetchone()[0]
+
+
+def select_plates(connection,
+                  tag=None,
+                  status=None,
+                  dimension=None,
+                  limit=-1,
+                  offset=0):
+    """list name, status and dimension of the plates matching the filter"""
+    condition, parameters = plate_filter(tag, status, dimension)
+    statement = ("SELECT name, status, width, height FROM plates" +
+                 condition + " ORDER BY name LIMIT ? OFFSET ?")
+
+    return connection.execute(statement,
+                              parameters + [limit, offset]).fetchall()
+
+
+def folder_plates(locator, tag=None):
+    """list the plates found in the folders, if there is no catalog"""
+    return [(name, os.path.dirname(path), None, None)
+            for name, path in sorted(locator.paths.items())
+            if not tag or name.split("+")[0] == tag]
+
+
+def clamp_page(page, total, per_page):
+    """report the page within the range of pages, and the number of pages"""
+    pages = max(1, -(-total // per_page))
+    return min(max(page, 1), pages), pages
+
+
+def render_page(rows, total, query, page, per_page):
+    """write the HTML of one page of the gallery (rows of this page only)"""
+    page, pages = clamp_page(page, total, per_page)
+
+    figures = []
+    for name, status, width, height in rows:
+        caption = html.escape(name)
+        if status:
+            caption += f" &middot; {html.escape(status)}"
+        if width:
+            caption += f" &middot; {html.escape(f'{width} x {height}')}"
+        figures.append(f'<figure><img src="/svg/{quote(name)}" '
+                       f'loading="lazy" decoding="async" alt="">'
+                       f"<figcaption>{caption}</figcaption></figure>")
+
+    links = []
+    for label, target in (("&laquo; previous", page - 1), ("next &raquo;",
+                                                            page + 1)):
+        if 1 <= target <= pages:
+            parameters = dict(query, page=target)
+            links.append(f'<a href="/?{html.escape(urlencode(parameters))}">'
+                         f"{label}</a>")
+    navigation = (f"{total} plates, page {page} of {pages} " +
+                  " ".join(links))
+
+    dimension = query.get("dimension", "")
+    options = "".join(
+        f'<option value="{value}"{" selected" if value == dimension else ""}>'
+        f"{value or 'any'}</option>" for value in [""] + DIMENSIONS)
+
+    return PAGE.format(tag=html.escape(query.get("tag", "")),
+                       status=html.escape(query.get("status", "")),
+                       dimensions=options,
+                       navigation=navigation,
+                       figures="\n".join(figures))
+
+
+class Handler(BaseHTTPRequestHandler):
+    """answer the requests for the gallery and the .svg"""
+
+    def __init__(self, *args, locator=None, catalog=CATALOG, per_page=120,
+                 **kwargs):
+        self.locator = locator
+        self.catalog = catalog
+        self.per_page = per_page
+        super().__init__(*args, **kwargs)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """dispatch by path"""
+        url = urlsplit(self.path)
+        if url.path == "/":
+            self.gallery(url.query)
+        elif url.path.startswith("/svg/"):
+            self.plate(unquote(url.path[len("/svg/"):]))
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def gallery(self, query_string):
+        """send one page of the gallery"""
+        query = {
+            key: values[0]
+            for key, values in parse_qs(query_string).items()
+            if key in ("tag", "status", "dimension", "page")
+        }
+        try:
+            page = int(query.pop("page", 1))
+        except ValueError:
+            page = 1
+
+        connection = open_catalog(self.catalog)
+        if connection is None:
+            rows = folder_plates(self.locator, query.get("tag"))
+            total = len(rows)
+            page, _ = clamp_page(page, total, self.per_page)
+            rows = rows[(page - 1) * self.per_page:page * self.per_page]
+        else:
+            selection = (query.get("tag"), query.get("status"),
+                         query.get("dimension"))
+            total = count_plates(connection, *selection)
+            page, _ = clamp_page(page, total, self.per_page)
+            rows = select_plates(connection,
+                                 *selection,
+                                 limit=self.per_page,
+                                 offset=(page - 1) * self.per_page)
+            connection.close()
+
+        body = render_page(rows, total, query, page,
+                           self.per_page).encode("utf-8")
+        self.send_body(body, "text/html; charset=utf-8", "no-cache")
+
+    def plate(self, name):
+        """send one .svg, or 304 if the browser's copy is current"""
+        path = self.locator.locate(name)
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+
+        with open(path, mode="rb") as source:
+            body = source.read()
+        etag = f'"{hashlib.md5(body).hexdigest()}"'
+
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        self.send_body(body, "image/svg+xml", "max-age=3600, must-revalidate",
+                       etag)
+
+    def send_body(self, body, content_type, cache, etag=None):
+        """send a response, compressed if the client accepts it"""
+        compress = ("gzip" in self.headers.get("Accept-Encoding", "")
+                    and len(body) > 1024)
+        if compress:
+            body = gzip.compress(body, compresslevel=6)
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", cache)
+        self.send_header("Vary", "Accept-Encoding")
+        if etag:
+            self.send_header("ETag", etag)
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """keep the console quiet, except for errors"""
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    locator = Locator(FOLDERS, args.rescan)
+    handler = partial(Handler,
+                      locator=locator,
+                      catalog=args.catalog,
+                      per_page=args.per_page)
+
+    try:
+        server = ThreadingHTTPServer((args.host, args.port), handler)
+    except OSError as error:
+        print(f"Error starting the server: {error}.  Exit.")
+        sys.exit()
+
+    print(f"{len(locator.paths)} plates found; "
+          f"see http://{args.host}:{args.port}/ (stop by Ctrl+C).")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_shard.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Distribute the .svg of a folder into shards, or export them flat.
+
+A flat folder of about 39k .svg is slow to list, and patterns like
+`*.svg` in the shell may exceed the limit of arguments of a command.
+Called from the CLI of Python 3 by
+
+python3 dek_shard.py -s [--scheme tag | hash] [folder]
+
+the .svg of the folder are moved into sub folders, either by their tag
+(e.g., `G_DEK`), or by the leading characters of a checksum about the
+keyword.  File `dek_layout.json` records the choice; the other scripts
+of this project then consult the shards instead of the folder's top
+level.  By
+
+python3 dek_shard.py -f [folder]
+
+the shards are dissolved again.  Because Anki expects a flat folder of
+media files, option
+
+python3 dek_shard.py -e collection [folder]
+
+exports the .svg (as hard links, where possible) into a flat folder
+`collection`, e.g. prior to the assembly of the deck."""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+
+from dek_scan import LAYOUT_FILE, place, read_layout, svg_paths
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="organize the .svg of a folder into shards",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-s",
+                       "--shard",
+                       action="store_true",
+                       help="move the .svg into shards")
+    group.add_argument("-f",
+                       "--flatten",
+                       action="store_true",
+                       help="move the .svg back into the folder")
+    group.add_argument("-e",
+                       "--export",
+                       metavar="",
+                       default=None,
+                       help="link or copy the .svg flat into this folder")
+
+    parser.add_argument("--scheme",
+                        choices=["tag", "hash"],
+                        default="tag",
+                        help="criterion to assign a .svg to a shard")
+    parser.add_argument("--depth",
+                        type=int,
+                        default=2,
+                        help="characters of the checksum for scheme hash")
+    parser.add_argument("folder",
+                        nargs="?",
+                        default=".",
+                        help="the folder to work with")
+
+    return parser.parse_args()
+
+
+def shard_folder(folder=".", scheme="tag", depth=2):
+    """move the .svg of a folder into their shards"""
+    if read_layout(folder) is not None:
+        print(f"Folder `{folder}` already is sharded.  Exit.")
+        sys.exit()
+
+    layout = {"scheme": scheme, "depth": depth}
+    names = [name for name, _ in svg_paths(folder)]
+    for name in names:
+        place(name, folder, layout)
+
+    with open(file=os.path.join(folder, LAYOUT_FILE),
+              mode="wt",
+              encoding="utf-8") as newfile:
+        json.dump(layout, newfile)
+    print(f"{len(names)} .svg moved into shards by {scheme}.")
+
+
+def flatten_folder(folder="."):
+    """move the .svg of the shards back into the folder"""
+    if read_layout(folder) is None:
+        print(f"Folder `{folder}` is not sharded.  Exit.")
+        sys.exit()
+
+    shards = set()
+    plates = list(svg_paths(folder))
+    for name, path in plates:
+        if os.path.normpath(os.path.dirname(path)) != os.path.normpath(
+                folder):
+            shards.add(os.path.dirname(path))
+            shutil.move(path, os.path.join(folder, name))
+
+    for shard in shards:
+        try:
+            os.rmdir(shard)
+        except OSError:
+            print(f"Folder `{shard}` is not empty, hence retained.")
+    os.remove(os.path.join(folder, LAYOUT_FILE))
+    print(f"{len(plates)} .svg are back in folder `{folder}`.")
+
+
+def export_flat(target, folder="."):
+    """provide the .svg of a folder in one flat folder"""
+    try:
+        os.mkdir(target)
+    except OSError:
+        print(f"Stop: check first if folder {target} already exists -- exit.")
+        sys.exit()
+
+    counter = 0
+    for name, path in svg_paths(folder):
+        destination = os.path.join(target, name)
+        try:
+            os.link(path, destination)
+        except OSError:
+            shutil.copy2(path, destination)
+        counter += 1
+    print(f"{counter} .svg exported into folder `{target}`.")
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if args.shard:
+        shard_folder(args.folder, args.scheme, args.depth)
+    elif args.flatten:
+        flatten_folder(args.folder)
+    elif args.export:
+        export_flat(args.export, args.folder)
+
+
+if __name__ == "__main__":
+    main()
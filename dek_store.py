@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_store.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Keep the harvests compressed and deduplicated in one store.
+
+Each harvest (folder `raw_data`, or a `depot_*` folder) holds about
+39k .svg, 340 MB of XML which mostly is the same as in the harvest
+before.  Instead of keeping a copy per harvest, this script files the
+content of each .svg once, compressed by xz, under the sha256 of the
+content (folder `dek_store/objects`).  A harvest then is a snapshot,
+i.e. a manifest (`dek_store/snapshots/<name>.json`) mapping the file
+names to sha256, md5 and size of their content.  Typical calls are
+
+python3 dek_store.py --add raw_data --name 2020-05-30
+python3 dek_store.py --list
+python3 dek_store.py --diff 2020-05-30 2026-10-19
+python3 dek_store.py --restore 2020-05-30 depot_2020-05-30
+
+where `--diff` reports the new, modified and retracted .svg between two
+snapshots by their manifests alone, without reading a single .svg.  The
+manifest equally may replace folder `raw_data` for the comparison by
+`dek_delta.py` (option `--manifest`)."""
+
+import argparse
+import hashlib
+import json
+import lzma
+import os
+import sys
+from datetime import datetime
+
+from dek_metrics import measure, progress
+from dek_scan import svg_paths
+
+STORE = "dek_store"
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="keep harvests of .svg as compressed snapshots",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("-a",
+                       "--add",
+                       metavar="",
+                       help="file the .svg of this folder as a snapshot")
+    group.add_argument("-l",
+                       "--list",
+                       action="store_true",
+                       help="list the snapshots")
+    group.add_argument("-d",
+                       "--diff",
+                       metavar="",
+                       nargs=2,
+                       help="compare two snapshots (old, new)")
+    group.add_argument("-r",
+                       "--restore",
+                       metavar="",
+                       nargs=2,
+                       help="write the .svg of a snapshot into a folder")
+
+    parser.add_argument("-n",
+                        "--name",
+                        metavar="",
+                        default=None,
+                        help="name of the new snapshot (default: date)")
+    parser.add_argument("--store",
+                        metavar="",
+                        default=STORE,
+                        help="folder of the store")
+
+    return parser.parse_args()
+
+
+def blob_path(digest, store=STORE):
+    """report where the content of a given sha256 is filed"""
+    return os.path.join(store, "objects", digest[:2], f"{digest[2:]}.xz")
+
+
+def file_blob(data, store=STORE):
+    """file the content of a .svg, unless already present; report it"""
+    digest = hashlib.sha256(data).hexdigest()
+    path = blob_path(digest, store)
+
+    if not os.path.isfile(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, mode="wb") as newfile:
+            newfile.write(lzma.compress(data, preset=9))
+        os.replace(temporary, path)
+
+    return {
+        "sha256": digest,
+        "md5": hashlib.md5(data).hexdigest(),
+        "size": len(data)
+    }
+
+
+def read_blob(digest, store=STORE):
+    """retrieve the content filed under a sha256"""
+    with open(blob_path(digest, store), mode="rb") as source:
+        return lzma.decompress(source.read())
+
+
+def manifest_path(name, store=STORE):
+    """report where the manifest of a snapshot is filed"""
+    return os.path.join(store, "snapshots", f"{name}.json")
+
+
+def load_manifest(name, store=STORE):
+    """read a manifest either by the name of the snapshot, or as file"""
+    path = name if os.path.isfile(name) else manifest_path(name, store)
+    try:
+        with open(file=path, mode="rt", encoding="utf-8") as source:
+            return json.load(source)
+    except FileNotFoundError:
+        print(f"There is no snapshot `{name}`.  Exit.")
+        sys.exit()
+
+
+def manifest_store(name, store=STORE):
+    """report the store a manifest belongs to
+
+    A manifest given as file (`<store>/snapshots/<name>.json`) belongs
+    to the store two levels above it; else, the store given is used."""
+    if name is not None and os.path.isfile(name):
+        candidate = os.path.dirname(os.path.dirname(os.path.abspath(name)))
+        if os.path.isdir(os.path.join(candidate, "objects")):
+            return candidate
+    return store
+
+
+def add_snapshot(folder, name, store=STORE):
+    """file the .svg of a folder, write the manifest of the snapshot"""
+    path = manifest_path(name, store)
+    if os.path.isfile(path):
+        print(f"Snapshot `{name}` already exists.  Exit.")
+        sys.exit()
+
+    plates = {}
+    with measure("store_add") as tally:
+        for file, location in progress(list(svg_paths(folder)),
+                                       stage="store",
+                                       tally=tally):
+            with open(location, mode="rb") as source:
+                data = source.read()
+            tally["bytes"] += len(data)
+            plates[file] = file_blob(data, store)
+
+    manifest = {
+        "name": name,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "source": os.path.abspath(folder),
+        "plates": dict(sorted(plates.items()))
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(file=f"{path}.tmp", mode="wt", encoding="utf-8") as newfile:
+        json.dump(manifest, newfile, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+    return manifest
+
+
+def list_snapshots(store=STORE):
+    """yield the names of the snapshots, oldest first"""
+    folder = os.path.join(store, "snapshots")
+    if not os.path.isdir(folder):
+        return
+    for file in sorted(os.listdir(folder)):
+        if file.endswith(".json"):
+            yield file[:-len(".json")]
+
+
+def diff_manifests(old, new):
+    """compare two manifests, report new, modified and retracted .svg"""
+    before = old["plates"]
+    after = new["plates"]
+
+    return {
+        "new": sorted(set(after) - set(before)),
+        "modified": sorted(name for name in set(after) & set(before)
+                           if after[name]["sha256"] != before[name]["sha256"]),
+        "retracted": sorted(set(before) - set(after))
+    }
+
+
+def restore(name, folder, store=STORE):
+    """write the .svg of a snapshot into a (new) folder
+
+    Reports the number of .svg written, and the names of those missing
+    or damaged in the store (thus not written)."""
+    manifest = load_manifest(name, store)
+    store = manifest_store(name, store)
+    os.makedirs(folder, exist_ok=True)
+    written = 0
+    damaged = []
+
+    with measure("store_restore") as tally:
+        for file, entry in progress(list(manifest["plates"].items()),
+                                    stage="restore",
+                                    tally=tally):
+            try:
+                data = read_blob(entry["sha256"], store)
+            except (OSError, lzma.LZMAError):
+                damaged.append(file)
+                continue
+            if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+                damaged.append(file)
+                continue
+            with open(os.path.join(folder, file), mode="wb") as newfile:
+                newfile.write(data)
+            written += 1
+            tally["bytes"] += len(data)
+
+    return written, damaged
+
+
+def store_size(store=STORE):
+    """report the bytes used by the compressed content of the store"""
+    total = 0
+    for root, _, files in os.walk(os.path.join(store, "objects")):
+        total += sum(os.path.getsize(os.path.join(root, file))
+                     for file in files)
+    return total
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if args.add:
+        name = args.name or datetime.now().strftime("%Y-%m-%d")
+        manifest = add_snapshot(args.add, name, args.store)
+        size = sum(entry["size"] for entry in manifest["plates"].values())
+        print(f"Snapshot `{name}`: {len(manifest['plates'])} .svg, "
+              f"{size} bytes; the store now uses {store_size(args.store)} "
+              "bytes.")
+
+    elif args.list:
+        for name in list_snapshots(args.store):
+            manifest = load_manifest(name, args.store)
+            size = sum(entry["size"] for entry in manifest["plates"].values())
+            print(f"{name:20} {manifest['date']:20} "
+                  f"{len(manifest['plates']):7} {size:12}")
+        print(f"compressed content: {store_size(args.store)} bytes")
+
+    elif args.diff:
+        old, new = (load_manifest(name, args.store) for name in args.diff)
+        for status, names in diff_manifests(old, new).items():
+            print(f"\n{status} ({len(names)}):")
+            for file in names:
+                print(file)
+
+    elif args.restore:
+        name, folder = args.restore
+        number, damaged = restore(name, folder, args.store)
+        print(f"{number} .svg of snapshot `{name}` written into `{folder}`.")
+        if damaged:
+            print(f"\n{len(damaged)} .svg are missing or damaged in the store"
+                  " and were not written:")
+            for file in damaged:
+                print(file)
+
+
+if __name__ == "__main__":
+    main()
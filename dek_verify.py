@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_verify.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Compare the optimized plates visually with the raw originals.
+
+Some of the parameters used with svgcleaner (e.g., a precision of one
+digit for coordinates, transformations applied to paths) may alter the
+thickness of a stroke which in short hand carries a meaning.  This
+script renders the raw .svg (e.g., in folder `raw_data`) and their
+optimized counterparts (in the working directory, after the rename by
+`dek_rename_2.py`) as bitmaps of the same width, and compares them
+
++ by the fraction of pixels differing noticeably, and
++ by the ratio of ink (the sum of darkness) of the optimized plate to
+  the raw one; thicker strokes yield a ratio above 1, thinner below.
+
+Plates beyond the thresholds are listed in `verify_report.tsv`.  The
+results are cached in `verify_cache.json` by the checksums of the two
+files; a subsequent run only checks pairs not seen before.  The call
+
+python3 dek_verify.py [--raw raw_data] [--optimized .] [-j 4]
+
+renders with `rsvg-convert` (package librsvg2-bin in Linux Debian), or
+with the Python library `cairosvg` if it is installed.  The bitmaps
+(PNG) are decoded with Python's standard library; the comparisons are
+distributed across a pool of processes.  With option `--bundle`, the
+optimized .svg are read from the bundle of dek_bundle.py."""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess as sub
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from dek_bundle import BUNDLE, read_index, read_plate
+from dek_catalog import note_status
+from dek_metrics import measure, progress
+from dek_rename_2 import create_new_name
+from dek_scan import svg_paths
+
+try:
+    import cairosvg
+except ImportError:
+    cairosvg = None
+
+CACHE = "verify_cache.json"
+REPORT = "verify_report.tsv"
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="compare optimized .svg visually with the raw ones",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("--raw",
+                        metavar="",
+                        default="raw_data",
+                        help="folder of the raw .svg")
+    parser.add_argument("--optimized",
+                        metavar="",
+                        default=".",
+                        help="folder of the optimized .svg")
+    parser.add_argument("--bundle",
+                        metavar="",
+                        nargs="?",
+                        const=BUNDLE,
+                        default=None,
+                        help="read the optimized .svg from this bundle")
+    parser.add_argument("-w",
+                        "--width",
+                        metavar="",
+                        type=int,
+                        default=300,
+                        help="width of the bitmaps in pixels")
+    parser.add_argument("--pixels",
+                        metavar="",
+                        type=float,
+                        default=0.002,
+                        help="tolerated fraction of differing pixels")
+    parser.add_argument("--ink",
+                        metavar="",
+                        type=float,
+                        default=0.05,
+                        help="tolerated deviation of the ratio of ink")
+    parser.add_argument("-j",
+                        "--jobs",
+                        metavar="",
+                        type=int,
+                        default=os.cpu_count() or 1,
+                        help="number of processes")
+
+    return parser.parse_args()
+
+
+def rasterize(data, width=300):
+    """render the content of a .svg as PNG of a fixed width"""
+    if cairosvg is not None:
+        return cairosvg.svg2png(bytestring=data, output_width=width)
+
+    result = sub.run(["rsvg-convert", "-w", str(width), "-f", "png"],
+                     input=data,
+                     capture_output=True,
+                     check=True)
+    return result.stdout
+
+
+def paeth(left, above, upper_left):
+    """predictor of PNG filter type 4"""
+    estimate = left + above - upper_left
+    distance_left = abs(estimate - left)
+    distance_above = abs(estimate - above)
+    distance_upper_left = abs(estimate - upper_left)
+    if distance_left <= distance_above and distance_left <= distance_upper_left:
+        return left
+    if distance_above <= distance_upper_left:
+        return above
+    return upper_left
+
+
+def decode_png(data):
+    """decode a non-interlaced 8 bit PNG into width, height and darkness
+
+    Darkness is 0 for white (or transparent) and 255 for black, one value
+    per pixel, with transparency composed onto a white background."""
+    if data[:8] != b"\x89PNG\r\n\x1a\n":
+        raise ValueError("not a PNG")
+
+    position = 8
+    chunks = []
+    width = None
+    while position < len(data):
+        if position + 8 > len(data):
+            raise ValueError("truncated PNG")
+        length, kind = struct.unpack(">I4s", data[position:position + 8])
+        content = data[position + 8:position + 8 + length]
+        position += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, color, _, _, interlace = struct.unpack(
+                ">IIBBBBB", content)
+        elif kind == b"IDAT":
+            chunks.append(content)
+        elif kind == b"IEND":
+            break
+
+    if width is None:
+        raise ValueError("no IHDR")
+    if depth != 8 or interlace or color not in (0, 2, 4, 6):
+        raise ValueError("unsupported kind of PNG")
+    channels = {0: 1, 2: 3, 4: 2, 6: 4}[color]
+    stride = width * channels
+    raw = zlib.decompress(b"".join(chunks))
+
+    pixels = bytearray(stride * height)
+    previous = bytearray(stride)
+    for row in range(height):
+        start = row * (stride + 1)
+        kind = raw[start]
+        line = bytearray(raw[start + 1:start + 1 + stride])
+        if kind == 1:
+            for i in range(channels, stride):
+                line[i] = (line[i] + line[i - channels]) & 0xFF
+        elif kind == 2:
+            line = bytearray((a + b) & 0xFF for a, b in zip(line, previous))
+        elif kind == 3:
+            for i in range(stride):
+                left = line[i - channels] if i >= channels else 0
+                line[i] = (line[i] + ((left + previous[i]) >> 1)) & 0xFF
+        elif kind == 4:
+            for i in range(stride):
+                left = line[i - channels] if i >= channels else 0
+                upper_left = previous[i - channels] if i >= channels else 0
+                line[i] = (line[i] + paeth(left, previous[i], upper_left)) & 0xFF
+        pixels[row * stride:(row + 1) * stride] = line
+        previous = line
+
+    if channels == 1:
+        darkness = bytes(255 - value for value in pixels)
+    elif channels == 2:
+        darkness = bytes((255 - pixels[i]) * pixels[i + 1] // 255
+                         for i in range(0, len(pixels), 2))
+    else:
+        darkness = bytearray(width * height)
+        for pixel, i in enumerate(range(0, len(pixels), channels)):
+            luminance = (299 * pixels[i] + 587 * pixels[i + 1] +
+                         114 * pixels[i + 2]) // 1000
+            alpha = pixels[i + 3] if channels == 4 else 255
+            darkness[pixel] = (255 - luminance) * alpha // 255
+
+    return width, height, darkness
+
+
+def compare(raw_path, optimized_path, width=300, bundle=None):
+    """score the visual difference of two .svg
+
+    If the name of a bundle is provided, the optimized .svg is read from
+    the bundle, with `optimized_path` as the name of the plate."""
+    with open(raw_path, mode="rb") as source:
+        raw = decode_png(rasterize(source.read(), width))
+    if bundle is not None:
+        optimized = decode_png(rasterize(read_plate(optimized_path, bundle),
+                                         width))
+    else:
+        with open(optimized_path, mode="rb") as source:
+            optimized = decode_png(rasterize(source.read(), width))
+
+    return score(raw, optimized)
+
+
+def score(raw, optimized):
+    """score the difference of two images decoded by decode_png"""
+    if raw[:2] != optimized[:2]:
+        return {"pixels": 1.0, "ink": None, "size": "differs"}
+
+    differing = sum(1 for a, b in zip(raw[2], optimized[2]) if abs(a - b) > 64)
+    ink_raw = sum(raw[2])
+    ink_optimized = sum(optimized[2])
+
+    return {
+        "pixels": round(differing / len(raw[2]), 6),
+        "ink": round(ink_optimized / ink_raw, 4) if ink_raw else None
+    }
+
+
+def checksum(path):
+    """md5sum of a file"""
+    with open(path, mode="rb") as source:
+        return hashlib.md5(source.read()).hexdigest()
+
+
+def pair_plates(raw_folder, optimized_folder, index=None):
+    """pair the raw .svg with the optimized ones by their (new) name"""
+    if index is not None:
+        optimized = {name: name for name in index}
+    else:
+        optimized = dict(svg_paths(optimized_folder))
+    pairs = []
+
+    for name, path in svg_paths(raw_folder):
+        new_name = create_new_name(name)
+        if new_name in optimized:
+            pairs.append((new_name, path, optimized[new_name]))
+
+    return pairs
+
+
+def read_cache(name=CACHE):
+    """read the results of earlier runs (errors are not retained)"""
+    if not os.path.isfile(name):
+        return {}
+    with open(file=name, mode="rt", encoding="utf-8") as source:
+        cache = json.load(source)
+    return {
+        key: result
+        for key, result in cache.items() if "error" not in result
+    }
+
+
+def write_cache(cache, name=CACHE):
+    """retain the results for the next run"""
+    temporary = f"{name}.tmp"
+    with open(file=temporary, mode="wt", encoding="utf-8") as newfile:
+        json.dump(cache, newfile)
+    os.replace(temporary, name)
+
+
+def is_flagged(result, pixels=0.002, ink=0.05):
+    """check if a result exceeds the thresholds"""
+    if result["pixels"] > pixels:
+        return True
+    return result["ink"] is not None and abs(result["ink"] - 1) > ink
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if cairosvg is None and shutil.which("rsvg-convert") is None:
+        print("Neither `rsvg-convert`, nor `cairosvg` is available.  Exit.")
+        sys.exit()
+
+    index = None
+    if args.bundle:
+        index = read_index(args.bundle)
+        if index is None:
+            print(f"There is no bundle `{args.bundle}`.  Exit.")
+            sys.exit()
+
+    cache = read_cache()
+    errors = {}
+    pairs = pair_plates(args.raw, args.optimized, index)
+    keys = {}
+    to_check = []
+    for name, raw_path, optimized_path in pairs:
+        optimized_md5 = (index[name][2]
+                         if index is not None else checksum(optimized_path))
+        key = f"{checksum(raw_path)}:{optimized_md5}:{args.width}"
+        keys[name] = key
+        if key not in cache:
+            to_check.append((name, raw_path, optimized_path, key))
+    print(f"{len(pairs)} pairs of plates, {len(to_check)} to render anew.")
+
+    with measure("verify") as tally, ProcessPoolExecutor(
+            max_workers=args.jobs) as pool:
+        futures = [(key,
+                    pool.submit(compare, raw_path, optimized_path,
+                                args.width, args.bundle))
+                   for _, raw_path, optimized_path, key in to_check]
+        for key, future in progress(futures, stage="verify", tally=tally):
+            try:
+                cache[key] = future.result()
+            except (sub.CalledProcessError, ValueError, zlib.error) as error:
+                # reported, but not cached: the next run tries again
+                errors[key] = {"pixels": 1.0, "ink": None, "error": str(error)}
+    write_cache(cache)
+
+    results = dict(cache, **errors)
+    flagged = [(name, results[key]) for name, key in sorted(keys.items())
+               if is_flagged(results[key], args.pixels, args.ink)]
+    with open(file=REPORT, mode="wt", encoding="utf-8") as newfile:
+        newfile.write("name\tpixels\tink\n")
+        for name, result in flagged:
+            newfile.write(f"{name}\t{result['pixels']}\t{result['ink']}\n")
+
+    print(f"{len(flagged)} plates beyond the thresholds, see `{REPORT}`.")
+    note_status((name for name, _ in flagged), "visual regression")
+
+
+if __name__ == "__main__":
+    main()
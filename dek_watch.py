@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# SPDX-License-Identifier: GPL-3.0-only
+
+# name:    dek_watch.py
+# author:  nbehrnd@yahoo.com
+# license: GPLv3
+# date:    [2026-10-19 Mon]
+# edit:    [2026-10-19 Mon]
+#
+"""Process the plates one by one as they arrive in folder antechamber.
+
+The update of the deck otherwise is a sequence of batches: fetch all
+.svg, then run `dek_delta.py -n / -m / -r`, rename, write the .csv,
+optimize, and clear.  Started prior to (or with) the download by
+
+python3 dek_watch.py [--output workshop] [-j 4] [--idle 600]
+
+this script watches folder `antechamber` and passes each .svg once
+written completely (no change for `--debounce` seconds) through
+
++ the comparison with the previous harvest (folder `raw_data`, or a
+  snapshot of `dek_store.py` by option `--manifest`); unchanged plates
+  are left alone,
++ the rename as by `dek_rename_2.py`,
++ the check of the dimension as by `dek_csv_4.py`; plates of another
+  dimension are put into `<output>/svg_skipped`,
++ the optimization as by `dek_optimize_5d.py`, if the executable of
+  svgcleaner is present,
+
+and writes the result into the output folder.  The .svg in antechamber
+are not altered.  The work is queued (`--queue` plates at most, the
+watcher waits if the workers lag behind) and done by `-j` threads.
+
+On Linux, the folder is watched by inotify; elsewhere (or if inotify
+is not available), the folder is scanned every `--interval` seconds.
+The script stops after `--idle` seconds without a new plate, or by
+Ctrl+C.  The result per plate is appended to `watch_log.jsonl`."""
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+
+from dek_catalog import note_rows
+from dek_csv_4 import has_regular_dimension
+from dek_metrics import measure
+from dek_optimize_5d import optimize
+from dek_rename_2 import create_new_name
+from dek_scan import plate_path, read_layout
+from dek_store import load_manifest
+
+LOG = "watch_log.jsonl"
+
+# see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+EVENT = struct.Struct("iIII")
+
+
+def get_args():
+    """collect instructions from the CLI"""
+    parser = argparse.ArgumentParser(
+        description="process the .svg as they arrive in antechamber",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument("--folder",
+                        metavar="",
+                        default="antechamber",
+                        help="the folder to watch")
+    parser.add_argument("--output",
+                        metavar="",
+                        default="workshop",
+                        help="write the processed .svg into this folder")
+    parser.add_argument("--manifest",
+                        metavar="",
+                        default=None,
+                        help="compare with this snapshot instead of raw_data")
+    parser.add_argument("--svgcleaner",
+                        metavar="",
+                        default="./svgcleaner",
+                        help="path to the executable of svgcleaner")
+    parser.add_argument("-j",
+                        "--jobs",
+                        metavar="",
+                        type=int,
+                        default=os.cpu_count() or 1,
+                        help="number of workers")
+    parser.add_argument("--queue",
+                        metavar="",
+                        type=int,
+                        default=256,
+                        help="upper limit of plates waiting for a worker")
+    parser.add_argument("--debounce",
+                        metavar="",
+                        type=float,
+                        default=2.0,
+                        help="seconds a file has to rest prior to its use")
+    parser.add_argument("--interval",
+                        metavar="",
+                        type=float,
+                        default=1.0,
+                        help="seconds between two checks of the folder")
+    parser.add_argument("--idle",
+                        metavar="",
+                        type=float,
+                        default=600,
+                        help="stop after this many seconds without a plate")
+    parser.add_argument("--polling",
+                        action="store_true",
+                        help="scan the folder even if inotify is available")
+
+    return parser.parse_args()
+
+
+def present(folder):
+    """map the .svg at the top level of a folder to size and modification"""
+    found = {}
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.endswith(".svg") and entry.is_file():
+                stat = entry.stat()
+                found[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return found
+
+
+def poll(folder, interval=1.0):
+    """yield the names of the .svg changed since the last scan"""
+    known = {}
+    while True:
+        current = present(folder)
+        yield [name for name, state in current.items()
+               if known.get(name) != state]
+        known = current
+        time.sleep(interval)
+
+
+def notify(folder, interval=1.0):
+    """yield the names of the .svg written or moved into a folder
+
+    Returns None if inotify is not available (e.g., not on Linux)."""
+    name = ctypes.util.find_library("c")
+    if not sys.platform.startswith("linux") or name is None:
+        return None
+    libc = ctypes.CDLL(name, use_errno=True)
+    if not hasattr(libc, "inotify_init1"):
+        return None
+
+    descriptor = libc.inotify_init1(os.O_CLOEXEC)
+    if descriptor < 0:
+        return None
+    if libc.inotify_add_watch(descriptor, os.fsencode(folder),
+                              IN_CLOSE_WRITE | IN_MOVED_TO) < 0:
+        os.close(descriptor)
+        return None
+
+    def events():
+        # the files present prior to the start of the watch
+        yield list(present(folder))
+        try:
+            while True:
+                ready, _, _ = select.select([descriptor], [], [], interval)
+                names = []
+                if ready:
+                    buffer = os.read(descriptor, 65536)
+                    offset = 0
+                    while offset < len(buffer):
+                        _, _, _, length = EVENT.unpack_from(buffer, offset)
+                        start = offset + EVENT.size
+                        file = buffer[start:start + length].rstrip(b"\0")
+                        offset = start + length
+                        if file.endswith(b".svg"):
+                            names.append(os.fsdecode(file))
+                yield names
+        finally:
+            os.close(descriptor)
+
+    return events()
+
+
+def previous_harvest(manifest=None):
+    """report a function which tells the md5sum of the previous plate"""
+    if manifest is not None:
+        checksums = {
+            name: entry["md5"]
+            for name, entry in load_manifest(manifest)["plates"].items()
+        }
+        return checksums.get
+
+    layout = read_layout("raw_data")
+
+    def from_raw_data(name):
+        path = plate_path(name, "raw_data", layout)
+        if not os.path.isfile(path):
+            return None
+        with open(path, mode="rb") as source:
+            return hashlib.md5(source.read()).hexdigest()
+
+    return from_raw_data
+
+
+def process(name, args, previous, executable):
+    """pass one plate through the stages, report the result"""
+    start = time.perf_counter()
+    with open(os.path.join(args.folder, name), mode="rb") as source:
+        data = source.read()
+
+    md5 = hashlib.md5(data).hexdigest()
+    old = previous(name)
+    result = {"name": create_new_name(name), "md5": md5, "size_in": len(data)}
+    if old == md5:
+        result["status"] = "unchanged"
+        return result
+    result["status"] = "new" if old is None else "modified"
+
+    if has_regular_dimension(data):
+        target = os.path.join(args.output, result["name"])
+        result["dimension"] = "accepted"
+        if executable:
+            data, result["passes"], result["mode"] = optimize(
+                data, executable)
+    else:
+        target = os.path.join(args.output, "svg_skipped", result["name"])
+        result["dimension"] = "skipped"
+
+    with open(f"{target}.tmp", mode="wb") as newfile:
+        newfile.write(data)
+    os.replace(f"{target}.tmp", target)
+
+    result["size_out"] = len(data)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def work(tasks, results, lock, args, previous, executable):
+    """process the plates of the queue until told to stop (None)"""
+    while True:
+        name = tasks.get()
+        if name is None:
+            tasks.task_done()
+            return
+        try:
+            result = process(name, args, previous, executable)
+        except (OSError, UnicodeDecodeError) as error:
+            result = {"name": create_new_name(name), "error": str(error)}
+        with lock:
+            results.append(result)
+        tasks.task_done()
+
+
+def flush(results, lock, log):
+    """record the results collected since the last call"""
+    with lock:
+        done = results[:]
+        results.clear()
+    if not done:
+        return 0
+
+    for result in done:
+        log.write(json.dumps(result, ensure_ascii=False) + "\n")
+    log.flush()
+
+    note_rows(({
+        "name": result["name"],
+        "status": "skipped" if result["dimension"] == "skipped" else
+        result["status"]
+    } for result in done if result.get("status") in ("new", "modified")),
+              "dek_watch.py")
+    return len(done)
+
+
+def main():
+    """join the functionalities"""
+    args = get_args()
+
+    if not os.path.isdir(args.folder):
+        print(f"There is no folder `{args.folder}` to watch.  Exit.")
+        sys.exit()
+    os.makedirs(os.path.join(args.output, "svg_skipped"), exist_ok=True)
+
+    executable = None
+    if os.path.isfile(args.svgcleaner):
+        executable = os.path.abspath(args.svgcleaner)
+    else:
+        print("svgcleaner not found, the plates are not optimized.")
+
+    events = None if args.polling else notify(args.folder, args.interval)
+    if events is None:
+        events = poll(args.folder, args.interval)
+        print(f"Scanning `{args.folder}` every {args.interval} s.")
+    else:
+        print(f"Watching `{args.folder}` by inotify.")
+
+    previous = previous_harvest(args.manifest)
+    tasks = queue.Queue(maxsize=args.queue)
+    results = []
+    lock = threading.Lock()
+    workers = [
+        threading.Thread(target=work,
+                         args=(tasks, results, lock, args, previous,
+                               executable),
+                         daemon=True) for _ in range(args.jobs)
+    ]
+    for worker in workers:
+        worker.start()
+
+    pending = {}
+    last = time.monotonic()
+    with measure("watch") as tally, open(file=LOG, mode="at",
+                                         encoding="utf-8") as log:
+        try:
+            for names in events:
+                now = time.monotonic()
+                for name in names:
+                    pending[name] = now
+                for name, stamp in list(pending.items()):
+                    if now - stamp >= args.debounce:
+                        del pending[name]
+                        tasks.put(name)
+                        last = now
+
+                tally["files"] += flush(results, lock, log)
+                if not pending and now - last > args.idle:
+                    print(f"No new plate for {args.idle} s.")
+                    break
+        except KeyboardInterrupt:
+            print("Stopped; the plates queued are completed.")
+
+        for _ in workers:
+            tasks.put(None)
+        for worker in workers:
+            worker.join()
+        tally["files"] += flush(results, lock, log)
+
+    print(f"{tally['files']} plates processed, see `{LOG}`.")
+
+
+if __name__ == "__main__":
+    main()